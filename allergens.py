@@ -0,0 +1,145 @@
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence
+
+# Alerjen -> malzeme taksonomisi. "include" kelimeleri malzeme adında kelime
+# olarak (çoğul eki dahil) aranır; "exclude" ifadeleri eşleşmeyi iptal eder
+# (ör. "Almond Milk" süt ürünü değildir).
+ALLERGEN_TAXONOMY: Dict[str, Dict[str, List[str]]] = {
+    "Peanuts": {
+        "include": ["peanut", "peanut butter", "groundnut"],
+        "exclude": [],
+    },
+    "Tree Nuts": {
+        "include": ["almond", "walnut", "cashew", "pecan", "hazelnut", "pistachio", "macadamia", "nut"],
+        "exclude": ["peanut", "coconut", "nutmeg"],
+    },
+    "Dairy": {
+        "include": ["milk", "cheese", "butter", "cream", "yogurt", "yoghurt", "whey", "ghee"],
+        "exclude": ["almond milk", "soy milk", "oat milk", "coconut milk", "rice milk", "peanut butter"],
+    },
+    "Eggs": {
+        "include": ["egg", "mayonnaise"],
+        "exclude": ["eggplant"],
+    },
+    "Shellfish": {
+        "include": ["shrimp", "prawn", "crab", "lobster", "scallop", "clam", "mussel", "oyster"],
+        "exclude": [],
+    },
+    "Soy": {
+        "include": ["soy", "soya", "tofu", "tempeh", "edamame", "miso"],
+        "exclude": [],
+    },
+    "Wheat": {
+        "include": ["wheat", "flour", "bread", "pasta", "couscous", "semolina", "noodle", "spaghetti"],
+        "exclude": ["gluten-free", "almond flour", "rice flour", "coconut flour"],
+    },
+}
+
+
+class _Rule:
+    __slots__ = ("include", "exclude")
+
+    def __init__(self, include: Sequence[str], exclude: Sequence[str]):
+        words = "|".join(re.escape(word.casefold()) for word in include)
+        self.include: Pattern[str] = re.compile(r"\b(?:%s)(?:s|es)?\b" % words)
+        self.exclude = [phrase.casefold() for phrase in exclude]
+
+    def matches(self, ingredient: str) -> bool:
+        if any(phrase in ingredient for phrase in self.exclude):
+            return False
+        return self.include.search(ingredient) is not None
+
+
+_RULES = {name.casefold(): _Rule(**rule) for name, rule in ALLERGEN_TAXONOMY.items()}
+
+# Snapshot başına saklanan serbest metin alerji bitmap'i sayısı
+MAX_FREE_TEXT = 256
+
+
+def _rule_for(allergy: str) -> _Rule:
+    # Taksonomide olmayan alerjiler malzeme adında kelime olarak aranır
+    rule = _RULES.get(allergy.casefold())
+    return rule if rule is not None else _Rule([allergy], [])
+
+
+class AllergenIndex:
+    """Alerjen -> tarif bitmap'i (RecipeIndex slot'ları üzerinde int bitset).
+
+    Taksonomideki alerjenlerin bitmap'leri katalog yüklenirken hazırlanır;
+    bir kullanıcının alerjilerini elemek birkaç OR/ANDNOT işlemine iner.
+    """
+
+    def __init__(self, slot_recipes: Sequence[Optional[Any]] = ()):
+        self._slot_recipes = list(slot_recipes)
+        self._bits: Dict[str, int] = {}
+        for key, rule in _RULES.items():
+            self._bits[key] = self._build(rule)
+        # Serbest metin alerjiler okuyucu thread'lerde hesaplanıp saklanır;
+        # yayınlanmış snapshot'ın _bits'i değişmesin diye ayrı ve kilitli
+        self._free_text: Dict[str, int] = {}
+        self._free_text_lock = threading.Lock()
+
+    def _build(self, rule: _Rule) -> int:
+        size = len(self._slot_recipes)
+        buf = bytearray((size + 7) // 8)
+        for slot, recipe in enumerate(self._slot_recipes):
+            if recipe is not None and self._recipe_matches(rule, recipe):
+                buf[slot >> 3] |= 1 << (slot & 7)
+        return int.from_bytes(buf, "little")
+
+    @staticmethod
+    def _recipe_matches(rule: _Rule, recipe: Any) -> bool:
+        return any(rule.matches(ingredient.name.casefold()) for ingredient in recipe.Ingredients)
+
+    def copy(self) -> "AllergenIndex":
+        clone = AllergenIndex.__new__(AllergenIndex)
+        clone._slot_recipes = list(self._slot_recipes)
+        clone._bits = dict(self._bits)
+        # Serbest metin bitmap'ler yeni snapshot'ta yeniden hesaplanır
+        clone._free_text = {}
+        clone._free_text_lock = threading.Lock()
+        return clone
+
+    def put(self, slot: int, recipe: Any) -> None:
+        if slot >= len(self._slot_recipes):
+            self._slot_recipes.extend([None] * (slot + 1 - len(self._slot_recipes)))
+        self._slot_recipes[slot] = recipe
+        bit = 1 << slot
+        for key, bits in self._bits.items():
+            if self._recipe_matches(_RULES[key], recipe):
+                self._bits[key] = bits | bit
+            else:
+                self._bits[key] = bits & ~bit
+
+    def delete(self, slot: int) -> None:
+        self._slot_recipes[slot] = None
+        mask = ~(1 << slot)
+        for key, bits in self._bits.items():
+            self._bits[key] = bits & mask
+
+    def allergen(self, allergy: str) -> int:
+        allergy = allergy.strip()
+        if not allergy:
+            # Boş alerji hiçbir tarifi elemez (boş desen her kelime sınırına uyardı)
+            return 0
+        key = allergy.casefold()
+        bits = self._bits.get(key)
+        if bits is not None:
+            return bits
+        with self._free_text_lock:
+            bits = self._free_text.get(key)
+        if bits is None:
+            # Serbest metin alerji: ilk kullanımda hesaplanıp saklanır
+            bits = self._build(_rule_for(allergy))
+            with self._free_text_lock:
+                if len(self._free_text) < MAX_FREE_TEXT:
+                    self._free_text[key] = bits
+        return bits
+
+    def exclude(self, allergies: Iterable[str]) -> int:
+        # Verilen alerjenlerden herhangi birini içeren tariflerin bitset'i
+        bits = 0
+        for allergy in allergies:
+            bits |= self.allergen(allergy)
+        return bits
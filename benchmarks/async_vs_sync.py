@@ -0,0 +1,123 @@
+"""Async ve sync endpoint varyantlarının verimini karşılaştırır.
+
+Aynı katalog/depo çağrıları iki ikiz uygulamayla ölçülür: biri `async def`
+(event loop'ta), diğeri `def` (FastAPI'nin thread havuzunda). İkisi de
+middleware'siz, aynı yanıt sınıfı (FastJSONResponse) ve önbelleksiz; fark
+sadece endpoint'lerin async/sync olmasıdır. Çalıştırma (httpx gerekir):
+
+    python benchmarks/async_vs_sync.py --requests 5000 --concurrency 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("USER_STORE_PATH", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException  # noqa: E402
+
+import main  # noqa: E402
+from responses import FastJSONResponse  # noqa: E402
+
+PATHS = [
+    "/getRecipeDetails?recipe_id=3",
+    "/getUserPreferences?user_id=bench-user",
+    "/getCategories",
+]
+
+
+def build_async_twin() -> FastAPI:
+    twin = FastAPI()
+
+    @twin.get("/getRecipeDetails")
+    async def get_recipe_details(recipe_id: int):
+        recipe = main.recipe_catalog.get(recipe_id)
+        if recipe is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        return FastJSONResponse(recipe)
+
+    @twin.get("/getUserPreferences")
+    async def get_user_preferences(user_id: str):
+        user_prefs = await main.user_preferences_db.aget(user_id)
+        if user_prefs is not None:
+            return FastJSONResponse(user_prefs)
+        return FastJSONResponse(main.UserPreferences.model_construct(user_id=user_id, preferences=main.DEFAULT_PREFERENCES))
+
+    @twin.get("/getCategories")
+    async def get_categories():
+        return FastJSONResponse(main.dummy_categories)
+
+    return twin
+
+
+def build_sync_twin() -> FastAPI:
+    twin = FastAPI()
+
+    @twin.get("/getRecipeDetails")
+    def get_recipe_details(recipe_id: int):
+        recipe = main.recipe_catalog.get(recipe_id)
+        if recipe is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        return FastJSONResponse(recipe)
+
+    @twin.get("/getUserPreferences")
+    def get_user_preferences(user_id: str):
+        user_prefs = main.user_preferences_db.get(user_id)
+        if user_prefs is not None:
+            return FastJSONResponse(user_prefs)
+        return FastJSONResponse(main.UserPreferences.model_construct(user_id=user_id, preferences=main.DEFAULT_PREFERENCES))
+
+    @twin.get("/getCategories")
+    def get_categories():
+        return FastJSONResponse(main.dummy_categories)
+
+    return twin
+
+
+async def drive(app, total: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    latencies = []
+    counter = iter(range(total))
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for i in counter:
+                start = time.perf_counter()
+                response = await client.get(PATHS[i % len(PATHS)])
+                latencies.append(time.perf_counter() - start)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": total,
+        "seconds": round(elapsed, 4),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99)] * 1000, 3),
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {
+        "concurrency": args.concurrency,
+        "async": asyncio.run(drive(build_async_twin(), args.requests, args.concurrency)),
+        "sync": asyncio.run(drive(build_sync_twin(), args.requests, args.concurrency)),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,269 @@
+"""main.py endpoint'leri için gecikme/verim ölçüm düzeneği.
+
+Recipe/Ingredient biçiminde sentetik kataloglar (varsayılan 1k/100k/1M tarif)
+üretilir ve her endpoint senaryosu süreç içi (httpx ASGI transport) ve/veya
+yerel bir uvicorn sunucusuna karşı çalıştırılır. Senaryo başına p50/p99
+gecikme ve verim, katalog başına kurulum süresi ve tepe RSS JSON olarak
+yazılır. Aynı --seed ile katalog ve istekler birebir aynıdır. Çalıştırma:
+
+    python benchmarks/endpoints.py --sizes 1000 100000 --mode both --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+os.environ.setdefault("USER_STORE_PATH", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+from catalog import RecipeCatalog  # noqa: E402
+
+INGREDIENTS = [
+    ("Flour", "cups"), ("Almond Milk", "cups"), ("Chicken Breast", "g"), ("Lettuce", "g"),
+    ("Tofu", "g"), ("Rice", "cups"), ("Salmon", "g"), ("Peanut Butter", "tbsp"),
+    ("Egg", "pcs"), ("Cheese", "g"), ("Walnuts", "g"), ("Shrimp", "g"), ("Soy Sauce", "tbsp"),
+    ("Spinach", "g"), ("Tomato", "pcs"), ("Avocado", "pcs"), ("Lentils", "cups"), ("Oats", "cups"),
+]
+STEPS = [
+    "Mix all ingredients well.", "Bake at 180 degrees for 25 minutes.", "Grill on high heat.",
+    "Stir fry quickly in a hot wok.", "Simmer gently until thick.", "Serve chilled with herbs.",
+    "Blend until smooth and creamy.", "Roast the vegetables until golden.",
+]
+
+# (senaryo adı, metot, yol, query parametreleri ya da gövde üreticisi)
+Scenario = Tuple[str, str, str, Callable[[random.Random, int], dict]]
+
+
+def synthesize(size: int, seed: int) -> list:
+    """Recipe şemasına uyan `size` tarif; doğrulama atlanarak hızlı kurulur."""
+    rng = random.Random(seed)
+    recipes = []
+    for recipe_id in range(1, size + 1):
+        ingredients = [
+            main.Ingredient.model_construct(name=name, quantity=round(rng.uniform(0.5, 300), 1), unit=unit)
+            for name, unit in rng.sample(INGREDIENTS, rng.randint(2, 6))
+        ]
+        recipes.append(
+            main.Recipe.model_construct(
+                ID=recipe_id,
+                Name=f"{rng.choice(INGREDIENTS)[0]} {rng.choice(['Bowl', 'Salad', 'Stew', 'Pie', 'Wrap'])} {recipe_id}",
+                Instructions=" ".join(rng.sample(STEPS, 3)),
+                Ingredients=ingredients,
+                TotalTime=float(rng.randint(5, 120)),
+                Calories=float(rng.randint(80, 900)),
+                Fat=round(rng.uniform(0, 60), 1),
+                Protein=round(rng.uniform(0, 70), 1),
+                Carbohydrate=round(rng.uniform(0, 120), 1),
+                Category=rng.choice(main.dummy_categories),
+                Label=rng.sample(main.dummy_preferences, rng.randint(0, 3)),
+            )
+        )
+    return recipes
+
+
+def install_catalog(size: int, seed: int) -> Dict[str, float]:
+    started = time.perf_counter()
+    recipes = synthesize(size, seed)
+    synthesized = time.perf_counter()
+    main.recipe_catalog = RecipeCatalog(recipes)
+    # Yeni katalog da versiyon 0'dan başlar; eski katalogdan kalan önbellekler atılır
+    main.response_cache.invalidate()
+    main.query_results.invalidate()
+    main.recommendation_engine.invalidate()
+    return {
+        "synthesize_s": round(synthesized - started, 3),
+        "build_s": round(time.perf_counter() - synthesized, 3),
+    }
+
+
+def _query(query: dict, field: str = "Calories", direction: str = "asc", **extra) -> Callable:
+    params = {"query": json.dumps(query), "sortBy.field": field, "sortBy.direction": direction, "limit": 50}
+    params.update(extra)
+    return lambda rng, size: params
+
+
+def scenarios() -> List[Scenario]:
+    return [
+        ("query_all", "GET", "/query", _query({})),
+        ("query_category", "GET", "/query", _query({"category": "Dinner"}, "Protein", "desc")),
+        ("query_diet", "GET", "/query", _query({"vegan": True, "gluten_free": True})),
+        ("query_range", "GET", "/query", _query({"Calories": {"min": 200, "max": 400}, "TotalTime": {"max": 30}})),
+        ("query_search", "GET", "/query", _query({"search": "grill chicken"}, "ID")),
+        ("query_combined", "GET", "/query", _query(
+            {"category": "Lunch", "vegetarian": True, "Protein": {"min": 10}, "search": "salad"}, "Fat", "asc",
+        )),
+        ("query_compound", "GET", "/query", _query({"vegan": True}, "Category asc, Calories desc, Name")),
+        ("query_fields", "GET", "/query", _query({"category": "Snack"}, fields="ID,Name,Ingredients.name")),
+        ("recipe_details", "GET", "/getRecipeDetails", lambda rng, size: {"recipe_id": rng.randint(1, size)}),
+        ("recipe_details_batch", "GET", "/getRecipeDetails", lambda rng, size: {
+            "recipe_id": [rng.randint(1, size) for _ in range(10)],
+        }),
+        ("user_recommendations", "GET", "/getUserRecommendations", lambda rng, size: {
+            "user_id": f"user-{rng.randint(1, 1000)}",
+        }),
+        ("set_user_preferences", "POST", "/setUserPreferences", lambda rng, size: {
+            "user_id": f"user-{rng.randint(1, 1000)}",
+            "preferences": {flag: rng.random() < 0.3 for flag in main.dummy_preferences},
+        }),
+        ("get_user_preferences", "GET", "/getUserPreferences", lambda rng, size: {
+            "user_id": f"user-{rng.randint(1, 1000)}",
+        }),
+        ("set_user_allergies", "POST", "/setUserAllergies", lambda rng, size: {
+            "user_id": f"user-{rng.randint(1, 1000)}",
+            "allergies": rng.sample(main.dummy_allergies, rng.randint(0, 2)),
+        }),
+        ("get_user_allergies", "GET", "/getUserAllergies", lambda rng, size: {
+            "user_id": f"user-{rng.randint(1, 1000)}",
+        }),
+    ]
+
+
+async def drive(client: httpx.AsyncClient, scenario: Scenario, size: int, total: int, concurrency: int, seed: int) -> dict:
+    name, method, path, make = scenario
+    rng = random.Random(seed)
+    requests = [make(rng, size) for _ in range(total)]
+    latencies: List[float] = []
+    counter = iter(requests)
+
+    async def worker():
+        for payload in counter:
+            start = time.perf_counter()
+            if method == "GET":
+                response = await client.get(path, params=payload)
+            else:
+                response = await client.post(path, json=payload)
+            latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "scenario": name,
+        "requests": total,
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 3),
+        "p99_ms": round(latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] * 1000, 3),
+    }
+
+
+async def run_scenarios(client: httpx.AsyncClient, size: int, args) -> List[dict]:
+    results = []
+    for scenario in scenarios():
+        if args.only and scenario[0] not in args.only:
+            continue
+        # Isınma turu ölçüme dahil edilmez
+        await drive(client, scenario, size, min(args.requests, 20), 1, args.seed + 1)
+        results.append(await drive(client, scenario, size, args.requests, args.concurrency, args.seed))
+    return results
+
+
+def _peak_rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    if pid is None:
+        # Linux'ta ru_maxrss KB, macOS'ta bayt cinsindendir
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+def bench_asgi(size: int, args) -> dict:
+    setup = install_catalog(size, args.seed)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            return await run_scenarios(client, size, args)
+
+    results = asyncio.run(run())
+    return {"mode": "asgi", "size": size, **setup, "peak_rss_mb": _peak_rss_mb(), "results": results}
+
+
+def bench_uvicorn(size: int, args) -> dict:
+    command = [
+        sys.executable, os.path.abspath(__file__), "--serve",
+        "--sizes", str(size), "--seed", str(args.seed), "--port", str(args.port),
+    ]
+    server = subprocess.Popen(command)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        started = time.perf_counter()
+        while True:
+            if server.poll() is not None:
+                raise RuntimeError("uvicorn exited during startup")
+            try:
+                httpx.get(base_url + "/getCategories", timeout=1.0)
+                break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        ready_s = round(time.perf_counter() - started, 3)
+
+        async def run():
+            limits = httpx.Limits(max_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+                return await run_scenarios(client, size, args)
+
+        results = asyncio.run(run())
+        return {"mode": "uvicorn", "size": size, "startup_s": ready_s, "peak_rss_mb": _peak_rss_mb(server.pid), "results": results}
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def serve(size: int, args) -> None:
+    import uvicorn
+
+    install_catalog(size, args.seed)
+    uvicorn.run(main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--mode", choices=["asgi", "uvicorn", "both"], default="asgi")
+    parser.add_argument("--requests", type=int, default=500, help="senaryo başına istek sayısı")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--only", nargs="*", help="sadece bu senaryolar")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="JSON çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.sizes[0], args)
+        return
+
+    runs = []
+    for size in args.sizes:
+        # Sunucu ayrı süreçte olduğu için önce o ölçülür (süreç içi RSS'i etkilemez)
+        if args.mode in ("uvicorn", "both"):
+            runs.append(bench_uvicorn(size, args))
+        if args.mode in ("asgi", "both"):
+            runs.append(bench_asgi(size, args))
+    report = json.dumps({"seed": args.seed, "concurrency": args.concurrency, "runs": runs}, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report + "\n")
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,68 @@
+"""Yanıt serileştirme yollarını karşılaştırır.
+
+Eski yol (FastAPI'nin jsonable_encoder + json.dumps zinciri) ile
+responses.JSON_ENCODERS içindeki her kodlayıcı aynı tarif listeleri üzerinde
+ölçülür; çıktıların JSON olarak eşit olduğu da kontrol edilir. Çalıştırma:
+
+    python benchmarks/serialization.py --sizes 1 30 500 --repeat 200
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("USER_STORE_PATH", "memory")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from responses import JSON_ENCODERS, _stdlib_dumps  # noqa: E402
+
+
+def synthesize(size: int) -> list:
+    # Dummy tarifler çoğaltılarak istenen boyutta liste üretilir
+    base = list(main.recipe_catalog.snapshot())
+    return [
+        base[i % len(base)].model_copy(update={"ID": i + 1})
+        for i in range(size)
+    ]
+
+
+def measure(dumps, content, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            dumps(content)
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 30, 500])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        recipes = synthesize(size)
+        content = recipes[0] if size == 1 else recipes
+        expected = json.loads(_stdlib_dumps(content))
+        baseline = measure(_stdlib_dumps, content, args.repeat)
+        row = {"recipes": size, "baseline_us": round(baseline * 1e6, 1)}
+        for name, dumps in JSON_ENCODERS.items():
+            if name == "stdlib":
+                continue
+            elapsed = measure(dumps, content, args.repeat)
+            row[name] = {
+                "us": round(elapsed * 1e6, 1),
+                "speedup": round(baseline / elapsed, 2),
+                "equal": json.loads(dumps(content)) == expected,
+            }
+        results.append(row)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,56 @@
+import json
+from typing import Any, Dict, List, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _error_detail(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first.get("loc", ()))
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+def parse_bulk(body: bytes, model: Type[M], ndjson: bool) -> Tuple[List[M], List[Dict[str, Any]]]:
+    """Toplu gövdeyi tek geçişte doğrular.
+
+    Gövde JSON dizisi ya da NDJSON (satır başına bir nesne) olabilir. Geçerli
+    modeller ve geçersiz satırlar için kısa hata kayıtları ({"row", "detail"})
+    döner; satır numaraları 0'dan başlar (NDJSON'da boş satırlar sayılmaz).
+    """
+    items: List[M] = []
+    errors: List[Dict[str, Any]] = []
+    if ndjson:
+        lines = [line for line in body.splitlines() if line.strip()]
+        for row, line in enumerate(lines):
+            try:
+                items.append(model.model_validate_json(line))
+            except ValidationError as e:
+                errors.append({"row": row, "detail": _error_detail(e)})
+        return items, errors
+
+    try:
+        rows = json.loads(body)
+    except ValueError:
+        raise ValueError("Body must be a JSON array or NDJSON")
+    if not isinstance(rows, list):
+        raise ValueError("Body must be a JSON array or NDJSON")
+    for row, obj in enumerate(rows):
+        try:
+            items.append(model.model_validate(obj))
+        except ValidationError as e:
+            errors.append({"row": row, "detail": _error_detail(e)})
+    return items, errors
+
+
+def is_ndjson(content_type: str, body: bytes) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type == NDJSON_MEDIA_TYPE:
+        return True
+    if media_type == "application/json":
+        return False
+    # Content-Type verilmediyse gövdenin ilk karakterine bak
+    return not body.lstrip().startswith(b"[")
@@ -0,0 +1,135 @@
+import threading
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+from allergens import AllergenIndex
+from columnar import RecipeColumns
+from recipe_index import RecipeIndex
+from search_index import SearchIndex
+
+
+class CatalogSnapshot:
+    """Kataloğun değişmez, versiyonlu bir görüntüsü.
+
+    Okuyucular istek başına bir kez snapshot alır ve sonuna kadar onu
+    kullanır; yazıcılar yeni bir snapshot yayınlar, eskisine dokunmaz.
+    """
+
+    __slots__ = ("by_id", "index", "columns", "allergens", "search", "version")
+
+    def __init__(
+        self,
+        by_id: Mapping[int, Any],
+        index: RecipeIndex,
+        columns: RecipeColumns,
+        allergens: AllergenIndex,
+        search: SearchIndex,
+        version: int,
+    ):
+        self.by_id = by_id
+        self.index = index
+        self.columns = columns
+        self.allergens = allergens
+        self.search = search
+        self.version = version
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.by_id.values())
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self.by_id
+
+    def get(self, recipe_id: int) -> Optional[Any]:
+        return self.by_id.get(recipe_id)
+
+    def get_many(self, recipe_ids: Iterable[int]) -> List[Any]:
+        # Bulunamayan ID'ler atlanır, sıra istekteki gibi kalır
+        by_id = self.by_id
+        return [by_id[rid] for rid in recipe_ids if rid in by_id]
+
+
+class RecipeCatalog:
+    """Recipe.ID ile anahtarlanmış birincil tarif deposu.
+
+    Okuma endpoint'leri ve ileride eklenecek yazma endpoint'leri aynı depoyu
+    kullanır. Yazmalar copy-on-write'tır: indeksler kopyalanıp güncellenir ve
+    yeni snapshot tek bir atama ile yayınlanır, böylece okumalar kilitsizdir.
+    """
+
+    def __init__(self, recipes: Iterable[Any] = ()):
+        recipes = list(recipes)
+        by_id = {recipe.ID: recipe for recipe in recipes}
+        index = RecipeIndex(recipes)
+        slot_table = index.slot_table()
+        self._snapshot = CatalogSnapshot(
+            MappingProxyType(by_id),
+            index,
+            RecipeColumns(slot_table),
+            AllergenIndex(slot_table),
+            SearchIndex(recipes),
+            0,
+        )
+        self._write_lock = threading.Lock()
+
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def __len__(self) -> int:
+        return len(self._snapshot)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._snapshot)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._snapshot
+
+    def get(self, recipe_id: int) -> Optional[Any]:
+        return self._snapshot.get(recipe_id)
+
+    def get_many(self, recipe_ids: Iterable[int]) -> List[Any]:
+        return self._snapshot.get_many(recipe_ids)
+
+    def apply(self, upserts: Iterable[Any] = (), removals: Iterable[int] = ()) -> CatalogSnapshot:
+        """Birden fazla değişikliği tek bir yeni snapshot olarak yayınlar."""
+        with self._write_lock:
+            current = self._snapshot
+            by_id: Dict[int, Any] = dict(current.by_id)
+            index = current.index.copy()
+            columns = current.columns.copy()
+            allergens = current.allergens.copy()
+            search = current.search.copy()
+            for recipe_id in removals:
+                if by_id.pop(recipe_id, None) is not None:
+                    slot = index.slot_of(recipe_id)
+                    columns.delete(slot)
+                    allergens.delete(slot)
+                    index.remove(recipe_id)
+                    search.remove(recipe_id)
+            for recipe in upserts:
+                by_id[recipe.ID] = recipe
+                index.add(recipe)
+                slot = index.slot_of(recipe.ID)
+                columns.put(slot, recipe)
+                allergens.put(slot, recipe)
+                search.add(recipe)
+            snapshot = CatalogSnapshot(
+                MappingProxyType(by_id), index, columns, allergens, search, current.version + 1
+            )
+            self._snapshot = snapshot
+            return snapshot
+
+    def upsert(self, recipe: Any) -> None:
+        self.apply(upserts=[recipe])
+
+    def remove(self, recipe_id: int) -> Optional[Any]:
+        recipe = self._snapshot.get(recipe_id)
+        if recipe is not None:
+            self.apply(removals=[recipe_id])
+        return recipe
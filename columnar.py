@@ -0,0 +1,290 @@
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Aralık filtrelerine açık sayısal Recipe alanları
+NUMERIC_FIELDS = ("Calories", "Fat", "Protein", "Carbohydrate", "TotalTime")
+
+Range = Tuple[Optional[float], Optional[float]]
+
+# Label bitmask'i uint64 olduğundan en fazla 64 farklı etiket desteklenir
+MAX_LABELS = 64
+
+# Sıralamaya açık metin alanları (anahtarları sözlük sırası rütbeleridir)
+TEXT_FIELDS = ("Name", "Category", "Instructions")
+SORT_FIELDS = ("ID",) + TEXT_FIELDS + NUMERIC_FIELDS
+
+
+def bits_to_mask(bits: int, size: int) -> np.ndarray:
+    # RecipeIndex/AllergenIndex int bitset'ini satır maskesine çevirir
+    raw = np.frombuffer(bits.to_bytes((size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(raw, bitorder="little")[:size].astype(bool)
+
+
+class RecipeColumns:
+    """Kataloğun kolon bazlı (NumPy) aynası.
+
+    Satır numarası RecipeIndex slot'u ile aynıdır. Besin alanları float32,
+    Category int kodu, Label ise bitmask olarak tutulur; /query filtreleri
+    tek seferde vektörel boolean maske olarak hesaplanır. Metin alanları
+    nesne dizisi olarak tutulur; sıralama rütbeleri ilk ihtiyaçta bir kez
+    hesaplanır.
+
+    Kategori ve etiket satır listeleri ile sıralı sayısal kolonlar (sıralı
+    değerler + satır permütasyonu) da ilk ihtiyaçta snapshot başına bir kez
+    kurulur; sorgu planının ilk yüklemi kolonu taramak yerine bunlardan
+    okunur, sayıları seçicilik tahmini olarak kullanılır.
+    """
+
+    def __init__(self, slot_recipes: Sequence[Optional[Any]] = ()):
+        size = len(slot_recipes)
+        self.category_codes: Dict[str, int] = {}
+        self.label_bits: Dict[str, int] = {}
+        self.live = np.fromiter((r is not None for r in slot_recipes), dtype=bool, count=size)
+        self.ids = np.fromiter((r.ID if r is not None else -1 for r in slot_recipes), dtype=np.int64, count=size)
+        self.numeric: Dict[str, np.ndarray] = {
+            field: np.fromiter(
+                (getattr(r, field) if r is not None else 0.0 for r in slot_recipes),
+                dtype=np.float32,
+                count=size,
+            )
+            for field in NUMERIC_FIELDS
+        }
+        self.text: Dict[str, np.ndarray] = {}
+        for field in TEXT_FIELDS:
+            values = self.text[field] = np.empty(size, dtype=object)
+            values[:] = [getattr(r, field) if r is not None else "" for r in slot_recipes]
+        self._ranks: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._id_order: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._stats: Dict[Any, Any] = {}  # seçicilik tahminleri için, ilk ihtiyaçta
+        self.category = np.fromiter(
+            (self._category_code(r.Category) if r is not None else -1 for r in slot_recipes),
+            dtype=np.int32,
+            count=size,
+        )
+        self.labels = np.fromiter(
+            (self._label_mask(r.Label) if r is not None else 0 for r in slot_recipes),
+            dtype=np.uint64,
+            count=size,
+        )
+
+    def __len__(self) -> int:
+        return int(self.live.sum())
+
+    def _category_code(self, category: str) -> int:
+        key = category.lower()
+        code = self.category_codes.get(key)
+        if code is None:
+            code = self.category_codes[key] = len(self.category_codes)
+        return code
+
+    def _label_mask(self, labels: Iterable[str]) -> int:
+        mask = 0
+        for label in labels:
+            bit = self.label_bits.get(label)
+            if bit is None:
+                if len(self.label_bits) >= MAX_LABELS:
+                    raise ValueError("Too many distinct labels for the label bitmask")
+                bit = self.label_bits[label] = len(self.label_bits)
+            mask |= 1 << bit
+        return mask
+
+    # Güncellemeler (copy-on-write ile kullanılır)
+
+    def copy(self) -> "RecipeColumns":
+        clone = RecipeColumns.__new__(RecipeColumns)
+        clone.category_codes = dict(self.category_codes)
+        clone.label_bits = dict(self.label_bits)
+        clone.live = self.live.copy()
+        clone.ids = self.ids.copy()
+        clone.numeric = {field: values.copy() for field, values in self.numeric.items()}
+        clone.text = {field: values.copy() for field, values in self.text.items()}
+        clone._ranks = {}
+        clone._id_order = None
+        clone._stats = {}
+        clone.category = self.category.copy()
+        clone.labels = self.labels.copy()
+        return clone
+
+    def _grow(self, size: int) -> None:
+        extra = size - len(self.live)
+        if extra <= 0:
+            return
+        self.live = np.concatenate([self.live, np.zeros(extra, dtype=bool)])
+        self.ids = np.concatenate([self.ids, np.full(extra, -1, dtype=np.int64)])
+        for field, values in self.numeric.items():
+            self.numeric[field] = np.concatenate([values, np.zeros(extra, dtype=np.float32)])
+        for field, values in self.text.items():
+            padding = np.empty(extra, dtype=object)
+            padding[:] = ""
+            self.text[field] = np.concatenate([values, padding])
+        self.category = np.concatenate([self.category, np.full(extra, -1, dtype=np.int32)])
+        self.labels = np.concatenate([self.labels, np.zeros(extra, dtype=np.uint64)])
+
+    def put(self, slot: int, recipe: Any) -> None:
+        self._grow(slot + 1)
+        self.live[slot] = True
+        self.ids[slot] = recipe.ID
+        for field, values in self.numeric.items():
+            values[slot] = getattr(recipe, field)
+        for field, values in self.text.items():
+            values[slot] = getattr(recipe, field)
+        self.category[slot] = self._category_code(recipe.Category)
+        self.labels[slot] = self._label_mask(recipe.Label)
+        self._ranks.clear()
+        self._id_order = None
+        self._stats = {}
+
+    def delete(self, slot: int) -> None:
+        self.live[slot] = False
+        self._id_order = None
+        self._stats = {}
+
+    def rows_of(self, recipe_ids: np.ndarray) -> np.ndarray:
+        """ID dizisinin canlı satırları (artan satır sırasında); bilinmeyen ID'ler atlanır."""
+        id_order = self._id_order
+        if id_order is None:
+            # Canlı satırların ID'ye göre sıralı permütasyonu; snapshot başına bir kez
+            rows = np.flatnonzero(self.live)
+            rows = rows[np.argsort(self.ids[rows])]
+            id_order = self._id_order = (self.ids[rows], rows)
+        sorted_ids, rows = id_order
+        if len(sorted_ids) == 0:
+            return rows
+        positions = np.minimum(np.searchsorted(sorted_ids, recipe_ids), len(sorted_ids) - 1)
+        found = sorted_ids[positions] == recipe_ids
+        return np.sort(rows[positions[found]])
+
+    # Sorgular
+
+    def mask(
+        self,
+        category: Optional[str] = None,
+        labels: Iterable[str] = (),
+        ranges: Optional[Mapping[str, Range]] = None,
+    ) -> np.ndarray:
+        mask = self.live.copy()
+        if category is not None:
+            code = self.category_codes.get(category.lower())
+            if code is None:
+                return np.zeros_like(mask)
+            mask &= self.category == code
+        required = 0
+        for label in labels:
+            bit = self.label_bits.get(label)
+            if bit is None:
+                return np.zeros_like(mask)
+            required |= 1 << bit
+        if required:
+            required = np.uint64(required)
+            mask &= (self.labels & required) == required
+        for field, (low, high) in (ranges or {}).items():
+            values = self.numeric[field]
+            if low is not None:
+                mask &= values >= np.float32(low)
+            if high is not None:
+                mask &= values <= np.float32(high)
+        return mask
+
+    # İndeksler: yüklemin eşleşen canlı satırları (artan sırada) ve sayıları.
+    # Snapshot başına ilk ihtiyaçta bir kez kurulup saklanır
+
+    def _category_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (kategori koduna göre kararlı sıralı canlı satırlar, kod başına başlangıçlar)
+        index = self._stats.get("category")
+        if index is None:
+            rows = np.flatnonzero(self.live)
+            rows = rows[np.argsort(self.category[rows], kind="stable")]
+            counts = np.bincount(self.category[rows], minlength=len(self.category_codes))
+            index = self._stats["category"] = (rows, np.concatenate(([0], np.cumsum(counts))))
+        return index
+
+    def category_rows(self, category: str) -> np.ndarray:
+        code = self.category_codes.get(category.lower())
+        if code is None:
+            return np.zeros(0, dtype=np.int64)
+        rows, starts = self._category_index()
+        return rows[starts[code]:starts[code + 1]]
+
+    def category_count(self, category: str) -> int:
+        code = self.category_codes.get(category.lower())
+        if code is None:
+            return 0
+        starts = self._category_index()[1]
+        return int(starts[code + 1] - starts[code])
+
+    def label_rows(self, labels: Tuple[str, ...]) -> np.ndarray:
+        # Etiketlerin hepsini taşıyan canlı satırlar; etiket kümesi başına saklanır
+        # (planlar sınırlı sayıdaki diyet bayraklarından oluşur)
+        rows = self._stats.get(("labels", labels))
+        if rows is None:
+            required = 0
+            for label in labels:
+                bit = self.label_bits.get(label)
+                if bit is None:
+                    return np.zeros(0, dtype=np.int64)
+                required |= 1 << bit
+            required = np.uint64(required)
+            rows = self._stats[("labels", labels)] = np.flatnonzero(((self.labels & required) == required) & self.live)
+        return rows
+
+    def _range_bounds(self, field: str, low: Optional[float], high: Optional[float]) -> Tuple[np.ndarray, int, int]:
+        # Sıralı kolonda ikili arama: (satır permütasyonu, başlangıç, bitiş)
+        index = self._stats.get(("range", field))
+        if index is None:
+            rows = np.flatnonzero(self.live)
+            rows = rows[np.argsort(self.numeric[field][rows], kind="stable")]
+            index = self._stats[("range", field)] = (self.numeric[field][rows], rows)
+        values, rows = index
+        start = 0 if low is None else int(np.searchsorted(values, np.float32(low), "left"))
+        end = len(values) if high is None else int(np.searchsorted(values, np.float32(high), "right"))
+        return rows, start, max(end, start)
+
+    def range_rows(self, field: str, low: Optional[float], high: Optional[float]) -> np.ndarray:
+        rows, start, end = self._range_bounds(field, low, high)
+        return np.sort(rows[start:end])
+
+    def range_count(self, field: str, low: Optional[float], high: Optional[float]) -> int:
+        _, start, end = self._range_bounds(field, low, high)
+        return end - start
+
+    def _text_ranks(self, field: str) -> Tuple[np.ndarray, np.ndarray]:
+        # (sıralı farklı değerler, satır -> rütbe); snapshot başına bir kez
+        ranks = self._ranks.get(field)
+        if ranks is None:
+            uniques, inverse = np.unique(self.text[field], return_inverse=True)
+            ranks = self._ranks[field] = (uniques, inverse.astype(np.int64))
+        return ranks
+
+    def sort_key(self, field: str) -> np.ndarray:
+        """Alanın satır başına sayısal sıralama anahtarı (SORT_FIELDS içinden)."""
+        if field == "ID":
+            return self.ids
+        if field in self.text:
+            return self._text_ranks(field)[1]
+        return self.numeric[field]
+
+    def key_of(self, field: str, value: Any) -> Any:
+        # Cursor değerini anahtar uzayına taşır; metin kolonda yoksa iki
+        # komşu rütbenin arasına (x.5) düşer
+        if field in self.text:
+            if not isinstance(value, str):
+                raise ValueError(f"Invalid value for {field}")
+            uniques = self._text_ranks(field)[0]
+            position = int(np.searchsorted(uniques, value))
+            if position < len(uniques) and uniques[position] == value:
+                return position
+            return position - 0.5
+        if field == "ID":
+            if isinstance(value, bool) or not isinstance(value, int):
+                raise ValueError(f"Invalid value for {field}")
+            return value
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Invalid value for {field}")
+        return np.float32(value)
+
+    def value_of(self, field: str, row: int) -> Any:
+        # Satırın alan değeri (JSON'a yazılabilir Python tipi); cursor için
+        if field in self.text:
+            return self.text[field][row]
+        return self.sort_key(field)[row].item()
@@ -0,0 +1,204 @@
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # opsiyonel bağımlılık
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # opsiyonel bağımlılık
+    zstandard = None
+
+# Bundan küçük gövdeler sıkıştırılmaz
+MINIMUM_SIZE = 500
+
+# Büyük gövdeler event loop'u bloklamasın diye thread'de sıkıştırılır
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+# Zaten sıkıştırılmış ya da parça parça iletilmesi gereken içerik tipleri
+EXCLUDED_CONTENT_TYPES = frozenset({
+    "application/gzip",
+    "application/zip",
+    "audio/*",
+    "font/woff2",
+    "image/*",
+    "text/event-stream",
+    "video/*",
+})
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush()
+
+
+# Kodlama -> (akış sıkıştırıcısı, istek başına seviye, önceden sıkıştırma seviyesi).
+# Sıra, Accept-Encoding'de eşit q değerlerinde tercih sırasıdır.
+CODECS: Dict[str, Tuple[Callable[[int], Any], int, int]] = {}
+if zstandard is not None:
+    CODECS["zstd"] = (_Zstd, 3, 12)
+if brotli is not None:
+    CODECS["br"] = (_Brotli, 4, 9)
+CODECS["gzip"] = (_Gzip, 6, 9)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding'den desteklenen en iyi kodlamayı seçer (yoksa None)."""
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        key, _, value = params.partition("=")
+        if key.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        weights[coding] = q
+    best, best_q = None, 0.0
+    for coding in CODECS:
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(coding: str, data: bytes, precompressed: bool = False) -> bytes:
+    factory, level, precompressed_level = CODECS[coding]
+    return factory(precompressed_level if precompressed else level).finish(data)
+
+
+class CompressionMiddleware:
+    """Accept-Encoding'e göre gzip/brotli/zstd yanıt sıkıştırması.
+
+    Starlette'in GZipMiddleware'i ile aynı akış; NDJSON gibi akan yanıtlar
+    parça parça sıkıştırılır. Content-Encoding'i zaten ayarlı yanıtlara
+    (ör. önbellekteki önceden sıkıştırılmış gövdeler) dokunulmaz.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        coding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        await _Responder(self.app, self.minimum_size, coding)(scope, receive, send)
+
+
+class _Responder:
+    # İstek başına send sarmalayıcısı: yanıt başlığı ilk gövde parçası gelene
+    # kadar tutulur, boyuta göre sıkıştırılıp başlıklar ona göre düzeltilir.
+    # coding None ise gövde olduğu gibi gider (sadece Vary eklenir)
+
+    def __init__(self, app: ASGIApp, minimum_size: int, coding: Optional[str]):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.coding = coding
+        self._send: Optional[Send] = None
+        self._start: Optional[Message] = None
+        self._passthrough = False
+        self._started = False
+        self._compressor = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._send = send
+        await self.app(scope, receive, self.send)
+
+    async def send(self, message: Message) -> None:
+        kind = message["type"]
+        if kind == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+            self._passthrough = (
+                "content-encoding" in headers
+                or message["status"] == 206
+                or media_type in EXCLUDED_CONTENT_TYPES
+                or media_type.partition("/")[0] + "/*" in EXCLUDED_CONTENT_TYPES
+            )
+            if self._passthrough:
+                await self._send(message)
+            else:
+                self._start = message
+            return
+        if self._passthrough or kind not in ("http.response.body", "http.response.pathsend"):
+            await self._send(message)
+            return
+        if kind == "http.response.pathsend":
+            # Dosya gövdesi sunucu tarafından gönderilir; sıkıştırılmaz
+            await self._send(self._start)
+            await self._send(message)
+            return
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self._started:
+            if self.coding is not None:
+                message["body"] = await self._compress(body, more_body)
+            await self._send(message)
+            return
+        self._started = True
+        if len(body) >= self.minimum_size or more_body:
+            headers = MutableHeaders(raw=list(self._start["headers"]))
+            headers.add_vary_header("Accept-Encoding")
+            if self.coding is not None:
+                message["body"] = await self._compress(body, more_body)
+                headers["Content-Encoding"] = self.coding
+                if more_body or self._start.get("trailers", False):
+                    del headers["Content-Length"]
+                else:
+                    headers["Content-Length"] = str(len(message["body"]))
+            self._start["headers"] = headers.raw
+        await self._send(self._start)
+        await self._send(message)
+
+    async def _compress(self, body: bytes, more_body: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        if self._compressor is None:
+            factory, level, _ = CODECS[self.coding]
+            self._compressor = factory(level)
+        if more_body:
+            return self._compressor.compress(body)
+        return self._compressor.finish(body)
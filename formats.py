@@ -0,0 +1,141 @@
+import functools
+import typing
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Type
+
+import pydantic_core
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from bulk import NDJSON_MEDIA_TYPE
+import responses
+from projection import Projection
+
+try:
+    import msgpack
+except ImportError:  # opsiyonel bağımlılık
+    msgpack = None
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+COLUMNAR_MEDIA_TYPE = "application/vnd.recipes.columnar+json"
+COLUMNAR_MSGPACK_MEDIA_TYPE = "application/vnd.recipes.columnar+msgpack"
+
+# Accept'te tanınan medya tipi -> biçim adı
+FORMATS: Dict[str, str] = {
+    JSON_MEDIA_TYPE: "json",
+    NDJSON_MEDIA_TYPE: "ndjson",
+    COLUMNAR_MEDIA_TYPE: "columnar",
+}
+if msgpack is not None:
+    FORMATS[MSGPACK_MEDIA_TYPE] = "msgpack"
+    FORMATS["application/x-msgpack"] = "msgpack"
+    FORMATS[COLUMNAR_MSGPACK_MEDIA_TYPE] = "columnar-msgpack"
+
+MEDIA_TYPES: Dict[str, str] = {
+    "json": JSON_MEDIA_TYPE,
+    "ndjson": NDJSON_MEDIA_TYPE,
+    "msgpack": MSGPACK_MEDIA_TYPE,
+    "columnar": COLUMNAR_MEDIA_TYPE,
+    "columnar-msgpack": COLUMNAR_MSGPACK_MEDIA_TYPE,
+}
+
+
+def negotiate(accept: str) -> str:
+    """Accept başlığından biçim seçer; eşitlikte ilk yazılan kazanır.
+
+    Tanınmayan tipler ve `*/*` yok sayılır, hiçbiri eşleşmezse JSON döner.
+    """
+    best, best_q = "json", 0.0
+    for part in accept.split(","):
+        media_type, _, params = part.partition(";")
+        fmt = FORMATS.get(media_type.strip().lower())
+        if fmt is None:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > best_q:
+            best, best_q = fmt, q
+    return best
+
+
+def _nested_model(annotation: Any) -> Optional[Type[BaseModel]]:
+    # List[Model] alanları iç içe kolonlara açılır
+    if typing.get_origin(annotation) in (list, List):
+        args = typing.get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return args[0]
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def columnar_layout(model: Type[BaseModel]) -> Tuple[Tuple[str, Optional[Tuple[str, ...]]], ...]:
+    """Model şemasından kolon düzeni: (alan, iç içe alanlar ya da None)."""
+    layout = []
+    for name, field in model.model_fields.items():
+        nested = _nested_model(field.annotation)
+        layout.append((name, tuple(nested.model_fields) if nested is not None else None))
+    return tuple(layout)
+
+
+def to_columnar(layout: Sequence[Tuple[str, Optional[Tuple[str, ...]]]], items: Sequence[BaseModel]) -> Dict[str, Any]:
+    """Satırları kolonlara çevirir; alan adları yanıtta bir kez geçer.
+
+    {"count": n, "columns": {"ID": [...], ...}, "nested": {"Ingredients": ["name", ...]}}
+    İç içe listeler (ör. Ingredients) satır başına değer dizileri olarak yazılır.
+    """
+    columns: Dict[str, List[Any]] = {}
+    nested_fields: Dict[str, List[str]] = {}
+    for name, nested in layout:
+        if nested is None:
+            columns[name] = [getattr(item, name) for item in items]
+        else:
+            nested_fields[name] = list(nested)
+            columns[name] = [
+                [[getattr(child, sub) for sub in nested] for child in getattr(item, name)]
+                for item in items
+            ]
+    return {"count": len(items), "columns": columns, "nested": nested_fields}
+
+
+def _msgpack_dumps(content: Any) -> bytes:
+    return msgpack.packb(pydantic_core.to_jsonable_python(content), use_bin_type=True)
+
+
+def encode(fmt: str, model: Type[BaseModel], content: Any, projection: Optional[Projection] = None) -> bytes:
+    """`content` (model ya da model listesi) istenen biçimde kodlanır; NDJSON hariç.
+
+    `projection` verilirse sadece seçili alanlar okunur ve yazılır.
+    """
+    if fmt in ("columnar", "columnar-msgpack"):
+        layout = projection.layout if projection is not None else columnar_layout(model)
+        table = to_columnar(layout, [content] if isinstance(content, BaseModel) else content)
+        return responses.dumps(table) if fmt == "columnar" else _msgpack_dumps(table)
+    if projection is not None:
+        content = projection.apply(content)
+    if fmt == "msgpack":
+        return _msgpack_dumps(content)
+    return responses.dumps(content)
+
+
+def recipe_response(
+    request: Request,
+    model: Type[BaseModel],
+    content: Any,
+    headers: Optional[Dict[str, str]] = None,
+    projection: Optional[Projection] = None,
+) -> Response:
+    """Accept başlığına göre JSON, NDJSON, MessagePack ya da kolon biçiminde yanıt."""
+    fmt = negotiate(request.headers.get("accept", ""))
+    headers = dict(headers or {}, Vary="Accept")
+    if fmt == "ndjson":
+        items = [content] if isinstance(content, BaseModel) else content
+        return responses.ndjson_response(items, headers, projection.project if projection is not None else None)
+    if not isinstance(content, (BaseModel, list)):
+        content = list(content)
+    return Response(content=encode(fmt, model, content, projection), media_type=MEDIA_TYPES[fmt], headers=headers)
@@ -1,19 +1,64 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-import json
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+import functools
+import time
 
-app = FastAPI(title="Dummy Recipe Backend")
+import anyio
+import numpy as np
 
-# CORS desteği (mobil uygulama testleri için)
+from bulk import is_ndjson, parse_bulk
+from catalog import RecipeCatalog
+from compression import CompressionMiddleware
+from formats import MEDIA_TYPES, encode as encode_format, negotiate, recipe_response
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, REGISTRY as metrics_registry
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor, page_after
+from profiling import STORE as profile_store, ProfiledRoute, ProfilingMiddleware, admin_authorized
+from projection import Projection, compile_projection
+from query_plan import QueryPlanner
+from recommendations import RecommendationEngine
+from response_cache import ResponseCache
+from responses import FastJSONResponse, ndjson_response
+from result_cache import QueryResultCache
+from sorting import (
+    SortSpec, cursor_key, cursor_values, parse_sort, sort_keys, uses_relevance, with_tiebreak,
+)
+from storage import UserStore, open_user_store
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Kapanışta bekleyen (write-behind) yazmalar diske aktarılır; depolar aşağıda tanımlı
+    user_preferences_db.close()
+    user_allergies_db.close()
+
+# Model döndüren endpoint'ler FastJSONResponse'u doğrudan döndürür (jsonable_encoder atlanır)
+app = FastAPI(title="Dummy Recipe Backend", default_response_class=FastJSONResponse, lifespan=lifespan)
+# Endpoint'ler örnekleyici profilciye bağlanabilir (sadece seçilen isteklerde aktif)
+app.router.route_class = ProfiledRoute
+
+# CORS desteği (mobil uygulama testleri için). Tarayıcıdaki istemciler
+# sayfalama cursor'ını ve ETag'i ancak açıkça izin verilirse okuyabilir
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# gzip/brotli/zstd; önbellekli katalog yanıtları önceden sıkıştırılmış gelir ve atlanır
+app.add_middleware(CompressionMiddleware)
+
+# X-Profile başlığı ya da PROFILE_SAMPLE_RATE ile seçilen istekler profillenir
+app.add_middleware(ProfilingMiddleware)
+
+# En dışta: route başına gecikme (sıkıştırma dahil) ve işlemdeki istekler, /metrics'te
+app.add_middleware(MetricsMiddleware)
+
 # Modeller
 class Ingredient(BaseModel):
     name: str
@@ -609,8 +654,8 @@ dummy_recipes = [
         Label=["pescetarian"]
     ),
     Recipe(
-        ID=6,
-        Name="Recipe 6",
+        ID=31,
+        Name="Recipe 31",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Tomato", quantity=1.15, unit="pieces"),
@@ -627,8 +672,8 @@ dummy_recipes = [
         Label=["gluten_free"]
     ),
     Recipe(
-        ID=7,
-        Name="Recipe 7",
+        ID=32,
+        Name="Recipe 32",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Tofu", quantity=1.33, unit="g"),
@@ -645,8 +690,8 @@ dummy_recipes = [
         Label=["vegan", "vegetarian", "vegan"]
     ),
     Recipe(
-        ID=8,
-        Name="Recipe 8",
+        ID=33,
+        Name="Recipe 33",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Zucchini", quantity=1.8, unit="g"),
@@ -661,8 +706,8 @@ dummy_recipes = [
         Label=["dairy_free"]
     ),
     Recipe(
-        ID=9,
-        Name="Recipe 9",
+        ID=34,
+        Name="Recipe 34",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Peas", quantity=1.8, unit="g"),
@@ -678,8 +723,8 @@ dummy_recipes = [
         Label=["vegetarian"]
     ),
     Recipe(
-        ID=10,
-        Name="Recipe 10",
+        ID=35,
+        Name="Recipe 35",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Quinoa", quantity=0.75, unit="g"),
@@ -696,8 +741,8 @@ dummy_recipes = [
         Label=["vegetarian", "vegetarian", "dairy_free"]
     ),
     Recipe(
-        ID=11,
-        Name="Recipe 11",
+        ID=36,
+        Name="Recipe 36",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Cheese", quantity=1.61, unit="g"),
@@ -714,8 +759,8 @@ dummy_recipes = [
         Label=["dairy_free"]
     ),
     Recipe(
-        ID=12,
-        Name="Recipe 12",
+        ID=37,
+        Name="Recipe 37",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Egg", quantity=1.0, unit="pieces"),
@@ -730,8 +775,8 @@ dummy_recipes = [
         Label=["vegan"]
     ),
     Recipe(
-        ID=13,
-        Name="Recipe 13",
+        ID=38,
+        Name="Recipe 38",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Mushroom", quantity=0.7, unit="g"),
@@ -747,8 +792,8 @@ dummy_recipes = [
         Label=["gluten_free", "pescetarian", "vegetarian"]
     ),
     Recipe(
-        ID=14,
-        Name="Recipe 14",
+        ID=39,
+        Name="Recipe 39",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Beef", quantity=1.64, unit="g"),
@@ -765,8 +810,8 @@ dummy_recipes = [
         Label=["gluten_free", "gluten_free", "vegan"]
     ),
     Recipe(
-        ID=15,
-        Name="Recipe 15",
+        ID=40,
+        Name="Recipe 40",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Avocado", quantity=0.97, unit="pieces"),
@@ -782,8 +827,8 @@ dummy_recipes = [
         Label=["gluten_free"]
     ),
     Recipe(
-        ID=16,
-        Name="Recipe 16",
+        ID=41,
+        Name="Recipe 41",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Avocado", quantity=0.65, unit="pieces"),
@@ -798,8 +843,8 @@ dummy_recipes = [
         Label=["gluten_free", "gluten_free", "vegan"]
     ),
     Recipe(
-        ID=17,
-        Name="Recipe 17",
+        ID=42,
+        Name="Recipe 42",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Mushroom", quantity=1.43, unit="g"),
@@ -816,8 +861,8 @@ dummy_recipes = [
         Label=["vegetarian"]
     ),
     Recipe(
-        ID=18,
-        Name="Recipe 18",
+        ID=43,
+        Name="Recipe 43",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Cheese", quantity=1.05, unit="g"),
@@ -834,8 +879,8 @@ dummy_recipes = [
         Label=["vegan"]
     ),
     Recipe(
-        ID=19,
-        Name="Recipe 19",
+        ID=44,
+        Name="Recipe 44",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Spinach", quantity=1.24, unit="g"),
@@ -851,8 +896,8 @@ dummy_recipes = [
         Label=["dairy_free", "vegan", "vegetarian"]
     ),
     Recipe(
-        ID=20,
-        Name="Recipe 20",
+        ID=45,
+        Name="Recipe 45",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Cheese", quantity=1.85, unit="g"),
@@ -868,8 +913,8 @@ dummy_recipes = [
         Label=["pescetarian", "vegetarian"]
     ),
     Recipe(
-        ID=21,
-        Name="Recipe 21",
+        ID=46,
+        Name="Recipe 46",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Lentils", quantity=1.32, unit="g"),
@@ -885,8 +930,8 @@ dummy_recipes = [
         Label=["vegetarian", "vegan"]
     ),
     Recipe(
-        ID=22,
-        Name="Recipe 22",
+        ID=47,
+        Name="Recipe 47",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Tofu", quantity=0.87, unit="g"),
@@ -902,8 +947,8 @@ dummy_recipes = [
         Label=["vegetarian", "pescetarian", "pescetarian"]
     ),
     Recipe(
-        ID=23,
-        Name="Recipe 23",
+        ID=48,
+        Name="Recipe 48",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Spinach", quantity=1.96, unit="g"),
@@ -919,8 +964,8 @@ dummy_recipes = [
         Label=["gluten_free", "vegetarian"]
     ),
     Recipe(
-        ID=24,
-        Name="Recipe 24",
+        ID=49,
+        Name="Recipe 49",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Beef", quantity=1.78, unit="g"),
@@ -937,8 +982,8 @@ dummy_recipes = [
         Label=["dairy_free", "vegan"]
     ),
     Recipe(
-        ID=25,
-        Name="Recipe 25",
+        ID=50,
+        Name="Recipe 50",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Quinoa", quantity=0.57, unit="g"),
@@ -953,8 +998,8 @@ dummy_recipes = [
         Label=["pescetarian", "vegan", "vegetarian"]
     ),
     Recipe(
-        ID=26,
-        Name="Recipe 26",
+        ID=51,
+        Name="Recipe 51",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Cheese", quantity=1.82, unit="g"),
@@ -970,8 +1015,8 @@ dummy_recipes = [
         Label=["pescetarian", "pescetarian"]
     ),
     Recipe(
-        ID=27,
-        Name="Recipe 27",
+        ID=52,
+        Name="Recipe 52",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Peas", quantity=1.77, unit="g"),
@@ -986,8 +1031,8 @@ dummy_recipes = [
         Label=["vegan", "dairy_free"]
     ),
     Recipe(
-        ID=28,
-        Name="Recipe 28",
+        ID=53,
+        Name="Recipe 53",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Lentils", quantity=1.88, unit="g"),
@@ -1002,8 +1047,8 @@ dummy_recipes = [
         Label=["gluten_free", "gluten_free"]
     ),
     Recipe(
-        ID=29,
-        Name="Recipe 29",
+        ID=54,
+        Name="Recipe 54",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Mushroom", quantity=1.99, unit="g"),
@@ -1019,8 +1064,8 @@ dummy_recipes = [
         Label=["pescetarian", "vegetarian"]
     ),
     Recipe(
-        ID=30,
-        Name="Recipe 30",
+        ID=55,
+        Name="Recipe 55",
         Instructions="Mix the ingredients thoroughly and cook to perfection.",
         Ingredients=[
             Ingredient(name="Peas", quantity=1.03, unit="g"),
@@ -1037,119 +1082,335 @@ dummy_recipes = [
     ),
 ]
 
-# Kullanıcı tercihler ve alerji verilerini saklamak için in-memory veritabanı (sözlük)
-user_preferences_db: Dict[str, UserPreferences] = {}
-user_allergies_db: Dict[str, UserAllergies] = {}
+# Kullanıcı tercih ve alerji verileri: kalıcı depo (varsayılan SQLite/WAL,
+# write-behind + LRU). USER_STORE_PATH=memory ile eski in-memory sözlük davranışı.
+user_preferences_db: UserStore[UserPreferences] = open_user_store("user_preferences", UserPreferences)
+user_allergies_db: UserStore[UserAllergies] = open_user_store("user_allergies", UserAllergies)
+
+# Ayarlanmamış kullanıcılara dönen ortak, değişmez varsayılan tercihler (kullanıcı
+# başına saklanmaz; rastgele ID'lerle yapılan GET'ler belleği büyütmez)
+DEFAULT_PREFERENCES = Preferences(
+    dairy_free=False,
+    gluten_free=False,
+    pescetarian=False,
+    vegan=False,
+    vegetarian=False
+)
+
+def _user_store_stats():
+    stats = {}
+    for store_name, store in (("preferences", user_preferences_db), ("allergies", user_allergies_db)):
+        for key, value in store.stats().items():
+            stats[(("store", store_name), ("stat", key))] = value
+    return stats
+
+metrics_registry.gauge("user_store_size", "User store sizes (entries, cache entries/bytes, pending writes)", _user_store_stats)
 
 dummy_preferences = ["dairy_free", "gluten_free", "pescetarian", "vegan", "vegetarian"]
 dummy_allergies = ["Peanuts", "Tree Nuts", "Dairy", "Eggs", "Shellfish", "Soy", "Wheat"]
 
+# ID ile anahtarlanmış tarif deposu (kategori/diyet ters indeksi dahil)
+recipe_catalog = RecipeCatalog(dummy_recipes)
+
+metrics_registry.gauge(
+    "catalog_recipes",
+    "Recipes in the current catalog snapshot",
+    lambda: {(): len(recipe_catalog.snapshot())},
+)
+metrics_registry.gauge("catalog_version", "Current catalog version", lambda: {(): recipe_catalog.version})
+
+# /query için derlenmiş sorgu planları (ham metin ve normalize plan LRU'ları)
+query_planner = QueryPlanner(dummy_preferences)
+
+# /query sonuçları: plan + sıralama + katalog versiyonu -> sıralı satır dizileri
+query_results = QueryResultCache()
+
+# /query aşama süreleri: parse / filter / sort / encode
+_query_phases = metrics_registry.histogram("query_phase_seconds", "Time spent in each /query phase")
+QUERY_PHASES = {phase: _query_phases.labels(phase=phase) for phase in ("parse", "filter", "sort", "encode")}
+
+# Statik katalog endpoint'leri için serileştirilmiş yanıt önbelleği
+response_cache = ResponseCache()
+
+# Kullanıcı başına önbellekli öneri motoru; başka worker'ların tercih/alerji
+# yazmaları depo bildirimiyle ilgili kullanıcıları geçersiz kılar
+recommendation_engine = RecommendationEngine()
+user_preferences_db.subscribe(recommendation_engine.invalidate_many)
+user_allergies_db.subscribe(recommendation_engine.invalidate_many)
+
+def _recipe_projection(fields: Optional[List[str]], ignore_unknown: bool = False) -> Optional[Projection]:
+    # ?fields=Name,Ingredients.name -> alan kümesi başına derlenmiş seçici
+    if fields is None:
+        return None
+    try:
+        return compile_projection(Recipe, fields, ignore_unknown)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # API Endpoints
+# Hafif okuma endpoint'leri async'tir (thread havuzuna geçiş yok); CPU yoğun
+# /query senkron kalır ve FastAPI tarafından thread havuzunda çalıştırılır.
 
 @app.get("/getCategories")
-def get_categories():
-    return dummy_categories
+async def get_categories(request: Request):
+    # Liste değişirse versiyon (tuple) da değişir ve gövde yeniden üretilir
+    return await response_cache.respond(request, "categories", tuple(dummy_categories), lambda: dummy_categories)
 
 @app.get("/getUserRecommendations")
-def get_user_recommendations():
-    # Hepsi sana tavsiye: tüm dummy tarifler!
-    return dummy_recipes
+async def get_user_recommendations(
+    request: Request,
+    user_id: Optional[str] = None,
+    fields: Optional[List[str]] = Query(None),
+):
+    projection = _recipe_projection(fields)
+    catalog = recipe_catalog.snapshot()
+    if user_id is None and projection is not None:
+        # Alan seçimi varsa önbellek atlanır (alan kümeleri sınırsız)
+        return recipe_response(request, Recipe, list(catalog), projection=projection)
+    if user_id is None:
+        # Kullanıcı verilmezse eskisi gibi tüm tarifler; her biçim ayrı önbelleklenir
+        fmt = negotiate(request.headers.get("accept", ""))
+        if fmt == "ndjson":
+            return ndjson_response(iter(catalog), {"Vary": "Accept"})
+        return await response_cache.respond(
+            request,
+            f"recommendations:{fmt}",
+            catalog.version,
+            lambda: list(catalog),
+            media_type=MEDIA_TYPES[fmt],
+            encode=functools.partial(encode_format, fmt, Recipe),
+            headers={"Vary": "Accept"},
+        )
+    recipes = recommendation_engine.cached(user_id, catalog)
+    if recipes is None:
+        # Önbellek ıskası: depo okuması ve skorlama event loop'u bloklamasın.
+        # Nesil okumadan önce alınır; arada gelen bir güncelleme sonucu
+        # önbelleğe yazdırmaz (eski alerjilerle hesaplanmış öneri kalmaz)
+        generation = recommendation_engine.generation(user_id)
+        user_prefs = await user_preferences_db.aget(user_id)
+        user_allergies = await user_allergies_db.aget(user_id)
+        recipes = await anyio.to_thread.run_sync(
+            lambda: recommendation_engine.recommend(
+                user_id,
+                catalog,
+                preferences=user_prefs.preferences if user_prefs is not None else None,
+                allergies=user_allergies.allergies if user_allergies is not None else (),
+                generation=generation,
+            )
+        )
+    return recipe_response(request, Recipe, recipes, projection=projection)
 
 @app.get("/getRecipeDetails")
-def get_recipe_details(recipe_id: int):
-    for recipe in dummy_recipes:
-        if recipe.ID == recipe_id:
-            return recipe
-    raise HTTPException(status_code=404, detail="Recipe not found")
+async def get_recipe_details(
+    request: Request,
+    recipe_id: List[int] = Query(...),
+    fields: Optional[List[str]] = Query(None),
+):
+    projection = _recipe_projection(fields)
+    if len(recipe_id) == 1:
+        recipe = recipe_catalog.get(recipe_id[0])
+        if recipe is None:
+            raise HTTPException(status_code=404, detail="Recipe not found")
+        return recipe_response(request, Recipe, recipe, projection=projection)
+    # Toplu mod: ?recipe_id=1&recipe_id=2... bulunanları istek sırasıyla döndür
+    return recipe_response(request, Recipe, recipe_catalog.get_many(recipe_id), projection=projection)
 
 @app.get("/getRecipeCard")
-def get_recipe_card(recipe_id: int, fields: List[str] = Query(...)):
-    recipe = next((r for r in dummy_recipes if r.ID == recipe_id), None)
+async def get_recipe_card(request: Request, recipe_id: int, fields: List[str] = Query(...)):
+    # Bu endpoint eskiden beri bilinmeyen alanları sessizce atlar (mobil istemciler)
+    projection = _recipe_projection(fields, ignore_unknown=True)
+    recipe = recipe_catalog.get(recipe_id)
     if recipe is None:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    recipe_dict = recipe.dict()
-    # Sadece istenen alanları döndür
-    filtered_card = {field: recipe_dict.get(field) for field in fields if field in recipe_dict}
-    return filtered_card
+    # Sadece istenen alanlar okunup kodlanır
+    return recipe_response(request, Recipe, recipe, projection=projection)
 
 @app.get("/getPreferences")
-def get_preferences():
-    return dummy_preferences
+async def get_preferences(request: Request):
+    return await response_cache.respond(request, "preferences", tuple(dummy_preferences), lambda: dummy_preferences)
 
 @app.get("/getUserPreferences")
-def get_user_preferences(user_id: str):
-    if user_id in user_preferences_db:
-        return user_preferences_db[user_id]
-    # Daha önce ayarlanmamışsa default tercihler gönder
-    default_prefs = Preferences(
-        dairy_free=False,
-        gluten_free=False,
-        pescetarian=False,
-        vegan=False,
-        vegetarian=False
-    )
-    default_user_prefs = UserPreferences(user_id=user_id, preferences=default_prefs)
-    user_preferences_db[user_id] = default_user_prefs
-    return default_user_prefs
+async def get_user_preferences(user_id: str):
+    user_prefs = await user_preferences_db.aget(user_id)
+    if user_prefs is not None:
+        return FastJSONResponse(user_prefs)
+    # Daha önce ayarlanmamışsa default tercihler gönder (depoya yazılmaz)
+    return FastJSONResponse(UserPreferences.model_construct(user_id=user_id, preferences=DEFAULT_PREFERENCES))
 
 @app.post("/setUserPreferences")
-def set_user_preferences(preferences: UserPreferences):
-    user_preferences_db[preferences.user_id] = preferences
-    return {"message": "User preferences updated", "data": preferences}
+async def set_user_preferences(preferences: UserPreferences):
+    await user_preferences_db.aset_many([preferences])
+    recommendation_engine.invalidate(preferences.user_id)
+    return FastJSONResponse({"message": "User preferences updated", "data": preferences})
+
+async def _apply_bulk(request: Request, model, store: UserStore, partial: bool):
+    # Toplu yazma: tek geçişte doğrula, geçerli satırları tek seferde uygula
+    body = await request.body()
+    ndjson = is_ndjson(request.headers.get("content-type", ""), body)
+    try:
+        items, errors = await anyio.to_thread.run_sync(parse_bulk, body, model, ndjson)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if errors and not partial:
+        # Varsayılan hep-ya-hiç: hatalı satır varsa hiçbir şey yazılmaz
+        return JSONResponse(status_code=422, content={"applied": 0, "rejected": len(errors), "errors": errors})
+    await anyio.to_thread.run_sync(store.set_many, items)
+    recommendation_engine.invalidate_many(item.user_id for item in items)
+    return {"applied": len(items), "rejected": len(errors), "errors": errors}
+
+@app.post("/setUserPreferencesBulk")
+async def set_user_preferences_bulk(request: Request, partial: bool = False):
+    return await _apply_bulk(request, UserPreferences, user_preferences_db, partial)
+
+def _filtered_rows(compiled, catalog) -> np.ndarray:
+    # Kategori, diyet ve aralık yüklemleri seçicilik sırasıyla uygulanır;
+    # arama varsa sonuçlar alaka sırasında gelir
+    started = time.perf_counter()
+    rows = compiled.execute(catalog)
+    QUERY_PHASES["filter"].observe(time.perf_counter() - started)
+    return rows
+
+
+def _paged_rows(compiled, catalog, spec: SortSpec, head: Optional[int] = None) -> Tuple[np.ndarray, ...]:
+    # ID ile toplam sıraya getirilmiş satırlar ve sayfalama anahtarları.
+    # `head` verilirse sadece ilk `head` satır: birincil anahtarın eşiği
+    # np.partition ile O(N) bulunur, sadece eşiğin içindekiler sıralanır
+    rows = _filtered_rows(compiled, catalog)
+    started = time.perf_counter()
+    relevance = compiled.relevance(catalog, rows) if uses_relevance(spec) else None
+    keys = sort_keys(catalog.columns, rows, spec, relevance)
+    if head is not None and len(rows) > head:
+        threshold = np.partition(keys[0], head - 1)[head - 1]
+        keep = keys[0] <= threshold
+        rows, keys = rows[keep], [key[keep] for key in keys]
+    order = np.lexsort(keys[::-1])[:head]
+    result = (rows[order],) + tuple(key[order] for key in keys)
+    QUERY_PHASES["sort"].observe(time.perf_counter() - started)
+    return result
+
 
 @app.get("/query")
 def query_recipes(
+    request: Request,
     query: str,
     sortBy_field: str = Query(..., alias="sortBy.field"),
-    sortBy_direction: str = Query(..., alias="sortBy.direction")
+    sortBy_direction: str = Query("asc", alias="sortBy.direction"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[List[str]] = Query(None),
 ):
+    started = time.perf_counter()
+    projection = _recipe_projection(fields)
+    # Sorgu metni normalize plana çevrilip derlenir; tekrar eden metinler/şekiller önbellekten gelir
+    # sortBy.field tek alan ya da "Category asc, Calories desc" gibi bileşik
+    # anahtar olabilir; yönü yazılmayan anahtarlar sortBy.direction'ı kullanır.
+    # Arama alakası "relevance" anahtarıdır (sadece istenirse skorlanır)
     try:
-        query_dict = json.loads(query)
-    except Exception:
-        raise HTTPException(status_code=400, detail="Invalid query JSON")
-    
-    filtered = dummy_recipes
-
-    # Arama kelimesine göre filtrele
-    search_term = query_dict.get("search", "").lower()
-    if search_term:
-        filtered = [r for r in filtered if search_term in r.Name.lower()]
-    
-    # Kategori filtresi
-    if "category" in query_dict:
-        category = query_dict["category"].lower()
-        filtered = [r for r in filtered if r.Category.lower() == category]
-
-    # Diyet filtreleri
-    for filt in ["vegan", "vegetarian", "gluten_free", "dairy_free", "pescetarian"]:
-        if query_dict.get(filt, False):
-            filtered = [r for r in filtered if filt in r.Label]
+        compiled = query_planner.compile(query)
+        spec = parse_sort(sortBy_field, sortBy_direction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    QUERY_PHASES["parse"].observe(time.perf_counter() - started)
 
-    # Sıralama
-    reverse = sortBy_direction.lower() == "desc"
+    # İstek boyunca tek bir değişmez snapshot kullanılır (kilit gerekmez).
+    # Süzme + sıralama sonucu (sıralı satır dizileri) plan, sıralama ve katalog
+    # versiyonuyla önbelleklenir: ilk sayfa için sadece baş kısım, sonraki
+    # sayfalar için tüm sıra. Filter/sort aşamaları sadece ıskada ölçülür
+    catalog = recipe_catalog.snapshot()
+    index, columns = catalog.index, catalog.columns
+    # Yanıt her zaman bir sayfadır (limit verilmezse DEFAULT_PAGE_SIZE);
+    # sadece dönen sayfadaki modellere dokunulur, sonraki sayfa X-Next-Cursor'da
+    page_size = limit or DEFAULT_PAGE_SIZE
+    spec = with_tiebreak(spec)
     try:
-        filtered.sort(key=lambda r: getattr(r, sortBy_field), reverse=reverse)
-    except Exception:
-        pass
+        after = cursor_key(columns, spec, decode_cursor(cursor)) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    ordered = query_results.peek((compiled.plan, spec), catalog.version)
+    if ordered is None:
+        if after is None:
+            # İlk sayfa: tüm sonucu sıralamadan sadece baştaki satırlar seçilir
+            ordered = query_results.get(
+                (compiled.plan, spec, page_size),
+                catalog.version,
+                lambda: _paged_rows(compiled, catalog, spec, head=page_size + 1),
+            )
+        else:
+            ordered = query_results.get(
+                (compiled.plan, spec), catalog.version, lambda: _paged_rows(compiled, catalog, spec)
+            )
+    rows, *keys = ordered
+    page_rows, last = page_after(rows, keys, page_size, after)
+    page = index.at(page_rows)
+    headers = {}
+    if last is not None:
+        headers["X-Next-Cursor"] = encode_cursor(cursor_values(columns, spec, rows, keys, last))
+    sorted_at = time.perf_counter()
 
-    return filtered
+    # NDJSON akışında kodlama gövde gönderilirken yapılır; burada sadece kurulum ölçülür
+    response = recipe_response(request, Recipe, page, headers, projection=projection)
+    QUERY_PHASES["encode"].observe(time.perf_counter() - sorted_at)
+    return response
 
 @app.get("/getAllergies")
-def get_allergies():
-    return dummy_allergies
+async def get_allergies(request: Request):
+    return await response_cache.respond(request, "allergies", tuple(dummy_allergies), lambda: dummy_allergies)
 
 @app.get("/getUserAllergies")
-def get_user_allergies(user_id: str):
-    if user_id in user_allergies_db:
-        return user_allergies_db[user_id]
-    default_allergies = UserAllergies(user_id=user_id, allergies=[])
-    user_allergies_db[user_id] = default_allergies
-    return default_allergies
+async def get_user_allergies(user_id: str):
+    user_allergies = await user_allergies_db.aget(user_id)
+    if user_allergies is not None:
+        return FastJSONResponse(user_allergies)
+    return FastJSONResponse(UserAllergies.model_construct(user_id=user_id, allergies=[]))
 
 @app.post("/setUserAllergies")
-def set_user_allergies(allergies: UserAllergies):
-    user_allergies_db[allergies.user_id] = allergies
-    return {"message": "User allergies updated", "data": allergies}
+async def set_user_allergies(allergies: UserAllergies):
+    await user_allergies_db.aset_many([allergies])
+    recommendation_engine.invalidate(allergies.user_id)
+    return FastJSONResponse({"message": "User allergies updated", "data": allergies})
+
+@app.post("/setUserAllergiesBulk")
+async def set_user_allergies_bulk(request: Request, partial: bool = False):
+    return await _apply_bulk(request, UserAllergies, user_allergies_db, partial)
+
+@app.get("/metrics")
+async def get_metrics():
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+def _require_admin(token: Optional[str]) -> None:
+    if not admin_authorized(token):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+@app.get("/admin/profiles")
+async def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    return FastJSONResponse(profile_store.summary())
+
+@app.get("/admin/profiles/download")
+async def download_profile(
+    route: str,
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    x_admin_token: Optional[str] = Header(None),
+):
+    # route: eşleşen yol şablonu, ör. /query
+    _require_admin(x_admin_token)
+    name = route.strip("/").replace("/", "_") or "root"
+    if format == "speedscope":
+        return FastJSONResponse(
+            profile_store.speedscope(route),
+            headers={"Content-Disposition": f'attachment; filename="{name}.speedscope.json"'},
+        )
+    return Response(
+        content=profile_store.collapsed(route),
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{name}.collapsed.txt"'},
+    )
+
+@app.delete("/admin/profiles")
+async def reset_profiles(x_admin_token: Optional[str] = Header(None)):
+    _require_admin(x_admin_token)
+    profile_store.reset()
+    return {"message": "Profiles cleared"}
 
 # Uygulamayı çalıştırmak için (terminalden: uvicorn main:app --reload)
 if __name__ == "__main__":
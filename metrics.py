@@ -0,0 +1,211 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Sequence, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Saniye cinsinden gecikme kovaları (0.5 ms .. 10 s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    inner = ",".join('%s="%s"' % (key, value.replace("\\", "\\\\").replace('"', '\\"')) for key, value in labels)
+    return "{%s}" % inner
+
+
+class Gauge:
+    """Değeri okunduğu anda bir callback ile hesaplanan gösterge.
+
+    Callback {etiketler: değer} döndürür; sıcak yolda hiçbir maliyeti yoktur.
+    """
+
+    def __init__(self, name: str, documentation: str, collect: Callable[[], Mapping[Labels, float]]):
+        self.name = name
+        self.documentation = documentation
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        lines = ["# HELP %s %s" % (self.name, self.documentation), "# TYPE %s gauge" % self.name]
+        for labels, value in self.collect().items():
+            lines.append("%s%s %s" % (self.name, _format_labels(labels), value))
+        return lines
+
+
+class _CounterValue:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Counter:
+    """Sadece artan sayaç; etiket kombinasyonu başına bir alt değer.
+
+    Sıcak yolda `labels(...)` bir kez çağrılıp dönen değer saklanır, her
+    artış tek bir kilitli toplamadır.
+    """
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._children: Dict[Labels, _CounterValue] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels: str) -> _CounterValue:
+        key = tuple(sorted(labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, _CounterValue())
+        return child
+
+    def render(self) -> List[str]:
+        lines = ["# HELP %s %s" % (self.name, self.documentation), "# TYPE %s counter" % self.name]
+        for labels, child in list(self._children.items()):
+            lines.append("%s%s %s" % (self.name, _format_labels(labels), child.value))
+        return lines
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # son hücre +Inf
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Histogram:
+    """Kovalı dağılım (ör. gecikme); Prometheus histogram biçiminde yazılır."""
+
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._children: Dict[Labels, _HistogramValue] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels: str) -> _HistogramValue:
+        key = tuple(sorted(labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, _HistogramValue(self.buckets))
+        return child
+
+    def render(self) -> List[str]:
+        lines = ["# HELP %s %s" % (self.name, self.documentation), "# TYPE %s histogram" % self.name]
+        for labels, child in list(self._children.items()):
+            with child._lock:
+                counts, total, count = list(child.counts), child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append("%s_bucket%s %s" % (self.name, _format_labels(labels + (("le", le),)), cumulative))
+            lines.append("%s_sum%s %s" % (self.name, _format_labels(labels), total))
+            lines.append("%s_count%s %s" % (self.name, _format_labels(labels), count))
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, documentation: str, collect: Callable[[], Mapping[Labels, float]]) -> Gauge:
+        return self.register(Gauge(name, documentation, collect))
+
+    def _get_or_create(self, name: str, factory: Callable[[], object]):
+        # Aynı metrik birden fazla modülden istenebilir; ilk oluşturulan paylaşılır
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = factory()
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._get_or_create(name, lambda: Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(name, lambda: Histogram(name, documentation, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def cache_counters(cache: str) -> Tuple[_CounterValue, _CounterValue]:
+    """Bir önbellek için (isabet, ıska) sayaçları."""
+    counter = REGISTRY.counter("cache_requests_total", "Cache lookups by cache and result")
+    return counter.labels(cache=cache, result="hit"), counter.labels(cache=cache, result="miss")
+
+
+class MetricsMiddleware:
+    """Route başına gecikme histogramı, istek sayacı ve işlemdeki istek göstergesi.
+
+    Route etiketi eşleşen yol şablonudur (ör. /query); eşleşmeyen istekler
+    tek bir etiket altında toplanır, böylece etiket sayısı sınırlı kalır.
+    Süre, gövdenin son parçası gönderilene kadar ölçülür (akan yanıtlar dahil).
+    """
+
+    def __init__(self, app, registry: Registry = REGISTRY):
+        self.app = app
+        self.latency = registry.histogram("http_request_duration_seconds", "Request latency by route")
+        self.requests = registry.counter("http_requests_total", "Requests by route, method and status")
+        self.in_flight = 0
+        registry.gauge("http_requests_in_flight", "Requests currently being served", lambda: {(): self.in_flight})
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_flight -= 1
+            route = scope.get("route")
+            path = getattr(route, "path", "<unmatched>")
+            method = scope["method"]
+            self.latency.labels(route=path, method=method).observe(elapsed)
+            self.requests.labels(route=path, method=method, status=str(status)).inc()
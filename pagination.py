@@ -0,0 +1,61 @@
+import base64
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    # Sıralama anahtarlarının son sayfadaki değerleri; tipleri çağıran doğrular
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def _position(keys: Sequence[np.ndarray], after: Sequence[Any]) -> int:
+    # Sözlük sırasında artan anahtar kolonlarında `after`dan büyük ilk konum;
+    # her anahtar bir öncekinin eşitlik aralığını ikili aramayla daraltır
+    low, high = 0, len(keys[0])
+    for values, value in zip(keys, after):
+        segment = values[low:high]
+        low, high = (
+            low + int(np.searchsorted(segment, value, "left")),
+            low + int(np.searchsorted(segment, value, "right")),
+        )
+        if low == high:
+            break
+    return high
+
+
+def page_after(
+    rows: np.ndarray,
+    keys: Sequence[np.ndarray],
+    limit: int,
+    after: Optional[Sequence[Any]] = None,
+) -> Tuple[np.ndarray, Optional[int]]:
+    """Önceden sıralanmış sonuçtan `after` anahtarından sonraki sayfa.
+
+    `rows` ve `keys` (sözlük sırasında artan anahtar kolonları; azalan
+    alanlar negatiflenmiş) aynı sıradadır, ör. sonuç önbelleğinden. Cursor'un
+    yeri ikili aramayla bulunur, sayfa dilimlenir. İkinci değer, sonraki sayfa
+    varsa bu sayfanın son elemanının dizilerdeki konumudur (cursor ondan
+    üretilir), yoksa None.
+    """
+    start = _position(keys, after) if after is not None else 0
+    # Bir fazlasını almak sonraki sayfa olup olmadığını söyler
+    page = rows[start:start + limit + 1]
+    last = start + limit - 1 if len(page) > limit else None
+    return page[:limit], last
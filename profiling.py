@@ -0,0 +1,273 @@
+import contextvars
+import functools
+import hmac
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+# Örnekleme aralığı (saniye) ve route başına tutulan en fazla farklı yığın
+DEFAULT_INTERVAL = 0.001
+MAX_STACKS_PER_ROUTE = 10000
+
+PROFILE_HEADER = b"x-profile"
+
+Stack = Tuple[str, ...]
+
+_current: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("profile_session", default=None)
+
+
+def _frame_label(code) -> str:
+    return "%s (%s:%d)" % (code.co_qualname, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+class ProfileSession:
+    """Tek bir örneklenen isteğin yığın örnekleri.
+
+    Endpoint sarmalayıcısı çalıştığı thread'i ve kendi frame'ini kaydeder;
+    örnekleyici sadece o frame'in üstündeki yığını sayar. Async endpoint'lerde
+    başka bir görev çalışırken alınan örnekler (frame yığında yok) atılır.
+    """
+
+    __slots__ = ("thread_id", "anchor", "samples")
+
+    def __init__(self):
+        self.thread_id: Optional[int] = None
+        self.anchor = None
+        self.samples: "Counter[Stack]" = Counter()
+
+
+class Sampler:
+    """Aktif oturumlar varken çalışan, sys._current_frames tabanlı örnekleyici.
+
+    Örneklenmeyen isteklerin maliyeti yoktur: aktif oturum yokken thread
+    bekler, istek yolunda sadece bir ContextVar okunur.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        self._sessions: Dict[int, ProfileSession] = {}
+        self._labels: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, session: ProfileSession) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+                self._thread.start()
+            self._sessions[id(session)] = session
+        self._wakeup.set()
+
+    def detach(self, session: ProfileSession) -> None:
+        with self._lock:
+            self._sessions.pop(id(session), None)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def _sample(self) -> None:
+        frames = sys._current_frames()
+        # Kilit tur boyunca tutulur: detach() döndükten sonra oturumun
+        # örneklerine artık yazılmaz (STORE.add onları güvenle okur)
+        with self._lock:
+            for session in self._sessions.values():
+                frame = frames.get(session.thread_id)
+                stack = []
+                while frame is not None and frame is not session.anchor:
+                    stack.append(self._label(frame.f_code))
+                    frame = frame.f_back
+                if frame is None:
+                    continue
+                stack.append(self._label(frame.f_code))
+                stack.reverse()
+                session.samples[tuple(stack)] += 1
+
+    def _run(self) -> None:
+        while True:
+            if not self._sessions:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            self._sample()
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """Route başına birleştirilmiş yığın sayıları; collapsed/speedscope çıktısı."""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_stacks: int = MAX_STACKS_PER_ROUTE):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self._routes: Dict[str, "Counter[Stack]"] = {}
+        self._requests: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, route: str, samples: "Counter[Stack]") -> None:
+        with self._lock:
+            stacks = self._routes.setdefault(route, Counter())
+            self._requests[route] += 1
+            for stack, count in samples.items():
+                if stack in stacks or len(stacks) < self.max_stacks:
+                    stacks[stack] += count
+                else:
+                    # Sınır dolunca yeni yığınlar tek bir kovada toplanır
+                    stacks[("<truncated>",)] += count
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [
+                {"route": route, "requests": self._requests[route], "samples": sum(stacks.values())}
+                for route, stacks in self._routes.items()
+            ]
+
+    def stacks(self, route: str) -> "Counter[Stack]":
+        with self._lock:
+            return Counter(self._routes.get(route, ()))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._routes.clear()
+            self._requests.clear()
+
+    def collapsed(self, route: str) -> str:
+        # Brendan Gregg "collapsed" biçimi: kök;...;yaprak sayı
+        lines = ["%s %d" % (";".join(stack), count) for stack, count in sorted(self.stacks(route).items())]
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def speedscope(self, route: str) -> Dict[str, Any]:
+        frames: List[Dict[str, Any]] = []
+        frame_index: Dict[str, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks(route).items():
+            indices = []
+            for label in stack:
+                if label not in frame_index:
+                    frame_index[label] = len(frames)
+                    name, _, location = label.partition(" (")
+                    file, _, line = location.rstrip(")").rpartition(":")
+                    frame = {"name": name}
+                    if file:
+                        frame.update(file=file, line=int(line))
+                    frames.append(frame)
+                indices.append(frame_index[label])
+            samples.append(indices)
+            weights.append(count * self.interval)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": route,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": sum(weights),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": route,
+            "exporter": "recipe-backend profiling",
+        }
+
+
+SAMPLER = Sampler()
+STORE = ProfileStore(SAMPLER.interval)
+
+
+def _profiled(endpoint: Callable) -> Callable:
+    # Endpoint'i çalıştığı thread'de oturuma bağlayan sarmalayıcı
+    # (sync endpoint'ler thread havuzunda çalışır; ContextVar oraya taşınır)
+    if inspect.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def async_wrapper(*args, **kwargs):
+            session = _current.get()
+            if session is None:
+                return await endpoint(*args, **kwargs)
+            session.thread_id, session.anchor = threading.get_ident(), sys._getframe()
+            SAMPLER.attach(session)
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                SAMPLER.detach(session)
+
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        session = _current.get()
+        if session is None:
+            return endpoint(*args, **kwargs)
+        session.thread_id, session.anchor = threading.get_ident(), sys._getframe()
+        SAMPLER.attach(session)
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            SAMPLER.detach(session)
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """Endpoint'i örnekleyiciye bağlanabilir hale getiren route sınıfı."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled(endpoint), **kwargs)
+
+
+class ProfilingMiddleware:
+    """İsteğe bağlı (opt-in) örneklemeli profil.
+
+    Değeri PROFILE_TOKEN olan `X-Profile` başlığı (token ayarlı değilse başlık
+    yok sayılır) ya da `sample_rate` olasılığıyla seçilen istekler profillenir; yığınlar eşleşen
+    route şablonu altında STORE'da birleştirilir. Seçilmeyen isteklere tek
+    bir rastgele sayı dışında ek maliyet yoktur.
+    """
+
+    def __init__(self, app, sample_rate: Optional[float] = None, token: Optional[str] = None):
+        self.app = app
+        if sample_rate is None:
+            sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+        self.sample_rate = sample_rate
+        self.token = token if token is not None else os.environ.get("PROFILE_TOKEN")
+
+    def _selected(self, scope) -> bool:
+        if self.token:
+            for name, value in scope["headers"]:
+                if name == PROFILE_HEADER:
+                    return hmac.compare_digest(value, self.token.encode("utf-8"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+        session = ProfileSession()
+        reset = _current.set(session)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(reset)
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                STORE.add(route, session.samples)
+
+
+def admin_authorized(token: Optional[str]) -> bool:
+    # PROFILE_TOKEN ayarlı değilse admin uçları kapalıdır
+    expected = os.environ.get("PROFILE_TOKEN")
+    if not expected or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), expected.encode("utf-8"))
@@ -0,0 +1,137 @@
+import functools
+import typing
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+# Alan adı -> alt seçim (None: alanın tamamı)
+Spec = Dict[str, Optional["Spec"]]
+
+
+def _child_model(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    # (iç model, liste mi); Optional[...] sarmalayıcıları açılır
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) == 1:
+            return _child_model(args[0])
+    if origin in (list, List):
+        args = typing.get_args(annotation)
+        if args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+            return args[0], True
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    return None, False
+
+
+def parse_fields(model: Type[BaseModel], fields: Tuple[str, ...]) -> Spec:
+    """`Name`, `Ingredients.name` gibi yolları doğrulayıp seçim ağacına çevirir."""
+    spec: Spec = {}
+    for path in fields:
+        current_model, node = model, spec
+        parts = path.split(".")
+        for depth, part in enumerate(parts):
+            field = current_model.model_fields.get(part)
+            if field is None:
+                raise ValueError(f"Unknown field: {path}")
+            last = depth == len(parts) - 1
+            if last:
+                node[part] = None
+                break
+            if part in node and node[part] is None:
+                break  # alanın tamamı zaten seçili
+            current_model, _ = _child_model(field.annotation)
+            if current_model is None:
+                raise ValueError(f"Unknown field: {path}")
+            node = node.setdefault(part, {})
+    return spec
+
+
+def _expression(model: Type[BaseModel], spec: Spec, var: str, depth: int) -> str:
+    # Seçimi tek bir sözlük ifadesine çevirir; alanlar modeldeki sırayla yazılır
+    items = []
+    for name, field in model.model_fields.items():
+        if name not in spec:
+            continue
+        sub = spec[name]
+        value = f"{var}.{name}"
+        if sub is not None:
+            child_model, many = _child_model(field.annotation)
+            if many:
+                item = f"v{depth}"
+                inner = _expression(child_model, sub, item, depth + 1)
+                value = f"None if {value} is None else [{inner} for {item} in {value}]"
+            else:
+                value = f"None if {value} is None else {_expression(child_model, sub, value, depth + 1)}"
+        items.append(f"{name!r}: {value}")
+    return "{" + ", ".join(items) + "}"
+
+
+def _compile(model: Type[BaseModel], spec: Spec) -> Callable[[Any], Dict[str, Any]]:
+    # Alan adları model şemasından doğrulandığı için üretilen kaynak güvenlidir;
+    # her okuma doğrudan öznitelik erişimine derlenir (getattr/döngü yok)
+    source = f"def project(obj):\n    return {_expression(model, spec, 'obj', 0)}\n"
+    namespace: Dict[str, Any] = {}
+    exec(compile(source, f"<projection {model.__name__}>", "exec"), namespace)
+    return namespace["project"]
+
+
+class Projection:
+    """Belirli bir alan kümesi için derlenmiş seçici.
+
+    Sadece istenen özellikler okunur ve kodlanır; model önce tam sözlüğe
+    çevrilmez. `layout` kolon biçimi için aynı seçimi taşır.
+    """
+
+    def __init__(self, model: Type[BaseModel], fields: Tuple[str, ...]):
+        self.model = model
+        self.fields = fields
+        self.spec = parse_fields(model, fields)
+        self.project = _compile(model, self.spec)
+        self.layout = tuple(
+            (name, self._nested_fields(field.annotation, self.spec[name]))
+            for name, field in model.model_fields.items()
+            if name in self.spec
+        )
+
+    @staticmethod
+    def _nested_fields(annotation: Any, sub: Optional[Spec]) -> Optional[Tuple[str, ...]]:
+        # Kolon biçiminde List[Model] alanları iç alan listesiyle açılır
+        child_model, many = _child_model(annotation)
+        if child_model is None or not many:
+            return None
+        return tuple(sub) if sub is not None else tuple(child_model.model_fields)
+
+    def apply(self, content: Any) -> Any:
+        if isinstance(content, BaseModel):
+            return self.project(content)
+        return [self.project(item) for item in content]
+
+
+def normalize_fields(fields: Iterable[str]) -> Tuple[str, ...]:
+    # ?fields=Name&fields=ID ve ?fields=Name,ID aynı kümeye indirgenir
+    return tuple(sorted({part.strip() for value in fields for part in value.split(",") if part.strip()}))
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_projection(model: Type[BaseModel], fields: Tuple[str, ...]) -> Projection:
+    return Projection(model, fields)
+
+
+def _known(model: Type[BaseModel], path: str) -> bool:
+    try:
+        parse_fields(model, (path,))
+    except ValueError:
+        return False
+    return True
+
+
+def compile_projection(model: Type[BaseModel], fields: Iterable[str], ignore_unknown: bool = False) -> Projection:
+    """Alan kümesi başına bir kez derlenir, sonraki istekler önbellekten alır.
+
+    `ignore_unknown` ile bilinmeyen yollar hata yerine atlanır (eski istemciler için).
+    """
+    fields = normalize_fields(fields)
+    if ignore_unknown:
+        fields = tuple(path for path in fields if _known(model, path))
+    return _compile_projection(model, fields)
@@ -0,0 +1,232 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from columnar import NUMERIC_FIELDS
+from metrics import cache_counters
+from search_index import tokenize
+
+_HITS, _MISSES = cache_counters("query_plans")
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+# Ham metin önbelleğine alınan en uzun sorgu (karakter); daha uzun metinler
+# her seferinde çözülür (plan önbelleği yine kullanılır). Böylece ham metin
+# LRU'su en fazla max_queries * MAX_CACHED_QUERY karakter tutar
+MAX_CACHED_QUERY = 1024
+
+
+class QueryPlan(NamedTuple):
+    """/query filtresinin normalize edilmiş hali; plan önbelleğinin anahtarı.
+
+    Anahtar sırası ve yazımı farklı ama anlamca aynı sorgular (ör. etiket
+    sırası, kategori büyük/küçük harfi, aramadaki boşluklar) aynı plana iner.
+    """
+
+    category: Optional[str]
+    labels: Tuple[str, ...]
+    ranges: Tuple[Tuple[str, Optional[float], Optional[float]], ...]
+    search: Optional[Tuple[str, ...]]  # None: arama yok, (): hiçbir şeyle eşleşmez
+
+
+def parse_query(query: str, label_flags: Sequence[str]) -> QueryPlan:
+    """Sorgu JSON'unu doğrulayıp normalize eder; hatalı girdide ValueError."""
+    try:
+        query_dict = json.loads(query)
+    except ValueError:
+        raise ValueError("Invalid query JSON")
+    if not isinstance(query_dict, dict):
+        raise ValueError("Invalid query JSON")
+
+    # Sayısal aralık filtreleri, ör. {"Calories": {"min": 200, "max": 400}};
+    # düz sayı verilirse eşitlik olarak yorumlanır
+    ranges = []
+    for field in NUMERIC_FIELDS:
+        if field not in query_dict:
+            continue
+        bounds = query_dict[field]
+        low = bounds.get("min") if isinstance(bounds, dict) else bounds
+        high = bounds.get("max") if isinstance(bounds, dict) else bounds
+        for value in (low, high):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise ValueError(f"Invalid range filter for {field}")
+        ranges.append((field, low, high))
+
+    category = query_dict.get("category")
+    if category is not None and not isinstance(category, str):
+        raise ValueError("Invalid category filter")
+
+    search = query_dict.get("search", "")
+    if not isinstance(search, str):
+        raise ValueError("Invalid search filter")
+
+    return QueryPlan(
+        category=category.lower() if category is not None else None,
+        labels=tuple(sorted(flag for flag in label_flags if query_dict.get(flag, False))),
+        ranges=tuple(ranges),
+        search=tuple(tokenize(search)) if search else None,
+    )
+
+
+# Yüklemler: `estimate` tahmini eşleşen sayısı (sıralama için), `apply` satır
+# dizisini süzer; rows None ise (ilk yüklem) eşleşen canlı satırlar kolon
+# aynasının indeksinden okunur, sonrakiler sadece aday satırlara bakar.
+
+
+class _Category:
+    def __init__(self, category: str):
+        self.category = category
+
+    def estimate(self, columns: Any) -> int:
+        return columns.category_count(self.category)
+
+    def apply(self, columns: Any, rows: Optional[np.ndarray]) -> np.ndarray:
+        if rows is None:
+            return columns.category_rows(self.category)
+        code = columns.category_codes.get(self.category)
+        if code is None:
+            return _EMPTY
+        return rows[columns.category[rows] == code]
+
+
+class _Labels:
+    def __init__(self, labels: Tuple[str, ...]):
+        self.labels = labels
+
+    def estimate(self, columns: Any) -> int:
+        return len(columns.label_rows(self.labels))
+
+    def apply(self, columns: Any, rows: Optional[np.ndarray]) -> np.ndarray:
+        if rows is None:
+            return columns.label_rows(self.labels)
+        required = 0
+        for label in self.labels:
+            bit = columns.label_bits.get(label)
+            if bit is None:
+                return _EMPTY
+            required |= 1 << bit
+        required = np.uint64(required)
+        return rows[(columns.labels[rows] & required) == required]
+
+
+class _Range:
+    def __init__(self, field: str, low: Optional[float], high: Optional[float]):
+        self.field = field
+        self.low = None if low is None else np.float32(low)
+        self.high = None if high is None else np.float32(high)
+
+    def estimate(self, columns: Any) -> int:
+        return columns.range_count(self.field, self.low, self.high)
+
+    def apply(self, columns: Any, rows: Optional[np.ndarray]) -> np.ndarray:
+        if rows is None:
+            # Sıralı kolonda ikili arama; sadece aralıktaki satırlar sıralanır
+            return columns.range_rows(self.field, self.low, self.high)
+        values = columns.numeric[self.field][rows]
+        keep = np.ones(len(rows), dtype=bool)
+        if self.low is not None:
+            keep &= values >= self.low
+        if self.high is not None:
+            keep &= values <= self.high
+        return rows[keep]
+
+
+class CompiledQuery:
+    """Bir QueryPlan'ın çalıştırılabilir filtre hattı.
+
+    Yüklemler kolon aynasının indekslerine (kategori/etiket satır listeleri,
+    sıralı kolonlar) göre en seçiciden başlayarak sıralanır; ilki eşleşen
+    satırları indeksten okur, sonrakiler sadece kalan aday satırlara bakar. Sıra katalog
+    versiyonu başına bir kez hesaplanır. Arama önce skorsuz eşleşme olarak uygulanır; alaka skoru
+    sadece istenirse (`relevance`) kalan satırlar için hesaplanır.
+    """
+
+    def __init__(self, plan: QueryPlan):
+        self.plan = plan
+        steps: List[Any] = []
+        if plan.category is not None:
+            steps.append(_Category(plan.category))
+        if plan.labels:
+            steps.append(_Labels(plan.labels))
+        for field, low, high in plan.ranges:
+            if low is not None or high is not None:
+                steps.append(_Range(field, low, high))
+        self.steps = steps
+        self._order: Tuple[int, List[Any]] = (-1, steps)
+
+    def ordered_steps(self, catalog: Any) -> List[Any]:
+        version, steps = self._order
+        if version != catalog.version:
+            columns = catalog.columns
+            steps = sorted(self.steps, key=lambda step: step.estimate(columns))
+            self._order = (catalog.version, steps)
+        return steps
+
+    def execute(self, catalog: Any) -> np.ndarray:
+        """Eşleşen satırlar, artan slot sırasında (arama skorlanmaz, bkz. `relevance`)."""
+        columns = catalog.columns
+        rows: Optional[np.ndarray] = None
+        if self.plan.search is not None:
+            if not self.plan.search:
+                return _EMPTY
+            rows = columns.rows_of(catalog.search.match(" ".join(self.plan.search)))
+        for step in self.ordered_steps(catalog):
+            if rows is not None and len(rows) == 0:
+                break
+            rows = step.apply(columns, rows)
+        if rows is None:
+            rows = np.flatnonzero(columns.live)
+        return rows
+
+    def relevance(self, catalog: Any, rows: np.ndarray) -> np.ndarray:
+        # Satırların BM25 skoru; sadece relevance ile sıralanırken ve sadece
+        # süzülmüş satırlar için hesaplanır (arama yoksa hepsi 0)
+        if not self.plan.search:
+            return np.zeros(len(rows), dtype=np.float64)
+        return catalog.search.scores(" ".join(self.plan.search), catalog.columns.ids[rows])
+
+
+class QueryPlanner:
+    """Ham sorgu metni ve normalize plan için iki katmanlı LRU.
+
+    Aynı metin tekrar geldiğinde JSON hiç çözülmez; metni farklı ama anlamca
+    aynı sorgular normalize planda buluşup aynı derlenmiş hattı paylaşır.
+    `MAX_CACHED_QUERY` karakterden uzun metinler ham metin LRU'suna girmez.
+    """
+
+    def __init__(self, label_flags: Iterable[str], max_plans: int = 1024, max_queries: int = 4096):
+        self.label_flags = tuple(label_flags)
+        self.max_plans = max_plans
+        self.max_queries = max_queries
+        self._plans: "OrderedDict[QueryPlan, CompiledQuery]" = OrderedDict()
+        self._queries: "OrderedDict[str, CompiledQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def compile(self, query: str) -> CompiledQuery:
+        cacheable = len(query) <= MAX_CACHED_QUERY
+        if cacheable:
+            with self._lock:
+                compiled = self._queries.get(query)
+                if compiled is not None:
+                    self._queries.move_to_end(query)
+                    _HITS.inc()
+                    return compiled
+        plan = parse_query(query, self.label_flags)
+        with self._lock:
+            compiled = self._plans.get(plan)
+            if compiled is None:
+                _MISSES.inc()
+                compiled = self._plans[plan] = CompiledQuery(plan)
+                while len(self._plans) > self.max_plans:
+                    self._plans.popitem(last=False)
+            else:
+                _HITS.inc()
+                self._plans.move_to_end(plan)
+            if cacheable:
+                self._queries[query] = compiled
+                while len(self._queries) > self.max_queries:
+                    self._queries.popitem(last=False)
+        return compiled
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class RecipeIndex:
+    """Tarif ID'si <-> slot eşlemesi.
+
+    Her tarif bir slot numarası alır; RecipeColumns ve AllergenIndex aynı
+    slot numaralarını satır olarak kullanır. Filtreler, indeksleri ve
+    seçicilik tahminleri kolon aynasındadır; burada sadece slot tablosu
+    tutulur.
+    """
+
+    def __init__(self, recipes: Iterable[Any] = ()):
+        self._slots: Dict[int, int] = {}          # recipe ID -> slot
+        self._recipes: List[Optional[Any]] = []   # slot -> recipe
+        for recipe in recipes:
+            slot = self._slots.get(recipe.ID)
+            if slot is None:
+                self._slots[recipe.ID] = len(self._recipes)
+                self._recipes.append(recipe)
+            else:
+                self._recipes[slot] = recipe
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, recipe_id: int) -> bool:
+        return recipe_id in self._slots
+
+    def slot_of(self, recipe_id: int) -> Optional[int]:
+        return self._slots.get(recipe_id)
+
+    def slot_table(self) -> List[Optional[Any]]:
+        # slot -> recipe (silinmiş slotlar None); kolon aynası bu sırayı kullanır
+        return list(self._recipes)
+
+    def copy(self) -> "RecipeIndex":
+        clone = RecipeIndex.__new__(RecipeIndex)
+        clone._slots = dict(self._slots)
+        clone._recipes = list(self._recipes)
+        return clone
+
+    # Güncellemeler (artımlı)
+
+    def add(self, recipe: Any) -> None:
+        # Aynı ID güncelleniyorsa sıra korunsun diye slot aynı kalır
+        slot = self._slots.get(recipe.ID)
+        if slot is None:
+            self._slots[recipe.ID] = len(self._recipes)
+            self._recipes.append(recipe)
+        else:
+            self._recipes[slot] = recipe
+
+    def remove(self, recipe_id: int) -> None:
+        slot = self._slots.pop(recipe_id, None)
+        if slot is not None:
+            self._recipes[slot] = None
+
+    # Sorgular
+
+    def at(self, slots: Iterable[int]) -> List[Any]:
+        recipes = self._recipes
+        return [recipes[slot] for slot in slots]
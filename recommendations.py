@@ -0,0 +1,135 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from columnar import bits_to_mask
+from metrics import cache_counters
+
+DEFAULT_RECOMMENDATIONS = 20
+
+# Önbellek süresi (saniye). Diğer worker'lardaki güncellemeler depoların
+# değişiklik bildirimiyle (UserStore.subscribe) geçersiz kılınır; süre yedektir
+DEFAULT_TTL = 300.0
+
+_HITS, _MISSES = cache_counters("recommendations")
+
+
+def score_rows(columns: Any, rows: np.ndarray) -> np.ndarray:
+    # Basit skor: kalorinin proteinden gelen payı, uzun hazırlık süresi cezalı
+    calories = np.maximum(columns.numeric["Calories"][rows], 1.0)
+    protein_share = columns.numeric["Protein"][rows] * 4.0 / calories
+    return protein_share - 0.002 * columns.numeric["TotalTime"][rows]
+
+
+class RecommendationEngine:
+    """Kullanıcı tercihleri ve alerjilerine göre tarif önerileri.
+
+    Diyet tercihleri etiket maskesiyle, alerjiler alerjen bitmap'iyle elenir;
+    kalan adaylar skorlanıp ilk N tanesi döner. Sonuçlar (tarif ID listesi)
+    kullanıcı başına katalog versiyonuyla birlikte LRU önbellekte tutulur ve
+    tercih/alerji güncellenince (bu worker'da ya da depo bildirimiyle başka
+    bir worker'da) geçersiz kılınır; kayıtlar ayrıca `ttl` saniye sonra
+    düşer. Geçersiz kılma kullanıcının
+    neslini (generation) artırır; depolar okunmadan önce alınan nesil
+    değiştiyse hesaplanan sonuç önbelleğe yazılmaz.
+    """
+
+    def __init__(self, size: int = DEFAULT_RECOMMENDATIONS, max_users: int = 10000, ttl: float = DEFAULT_TTL):
+        self.size = size
+        self.max_users = max_users
+        self.ttl = ttl
+        # user_id -> (katalog versiyonu, tarif ID'leri, son geçerlilik zamanı)
+        self._cache: "OrderedDict[str, Tuple[int, List[int], float]]" = OrderedDict()
+        self._epoch = 0                        # invalidate() (tümü) sayacı
+        self._generations: Dict[str, int] = {}  # kullanıcı -> geçersiz kılma sayacı
+        self._lock = threading.Lock()
+
+    def generation(self, user_id: str) -> Tuple[int, int]:
+        # Tercih/alerji okunmadan önce alınır ve recommend()'a verilir
+        with self._lock:
+            return self._epoch, self._generations.get(user_id, 0)
+
+    def _lookup(self, user_id: str, catalog: Any) -> Optional[List[int]]:
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry is None or entry[0] != catalog.version:
+                return None
+            if entry[2] <= time.monotonic():
+                del self._cache[user_id]
+                return None
+            self._cache.move_to_end(user_id)
+            return entry[1]
+
+    def cached(self, user_id: str, catalog: Any) -> Optional[List[Any]]:
+        # Sadece önbellek isabetinde sonuç döner (async endpoint'in hızlı yolu);
+        # isabet/ıska sayaçları burada tutulur
+        recipe_ids = self._lookup(user_id, catalog)
+        if recipe_ids is None:
+            _MISSES.inc()
+            return None
+        _HITS.inc()
+        return catalog.get_many(recipe_ids)
+
+    def recommend(
+        self,
+        user_id: str,
+        catalog: Any,
+        preferences: Optional[Any] = None,
+        allergies: Iterable[str] = (),
+        generation: Optional[Tuple[int, int]] = None,
+    ) -> List[Any]:
+        """`generation`, tercih/alerjiler okunmadan önce alınan nesildir.
+
+        Okuma ile yazma arasında kullanıcı geçersiz kılındıysa sonuç eski
+        veriden hesaplanmıştır; döndürülür ama önbelleğe yazılmaz.
+        """
+        recipe_ids = self._lookup(user_id, catalog)
+        if recipe_ids is not None:
+            return catalog.get_many(recipe_ids)
+        recipe_ids = self._compute(catalog, preferences, allergies)
+        with self._lock:
+            current = (self._epoch, self._generations.get(user_id, 0))
+            if generation is not None and generation != current:
+                return catalog.get_many(recipe_ids)
+            self._cache[user_id] = (catalog.version, recipe_ids, time.monotonic() + self.ttl)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_users:
+                self._cache.popitem(last=False)
+        return catalog.get_many(recipe_ids)
+
+    def _compute(self, catalog: Any, preferences: Optional[Any], allergies: Iterable[str]) -> List[int]:
+        columns = catalog.columns
+        labels = []
+        if preferences is not None:
+            labels = [flag for flag, enabled in preferences.model_dump().items() if enabled]
+        mask = columns.mask(labels=labels)
+        excluded = catalog.allergens.exclude(allergies)
+        if excluded:
+            mask &= ~bits_to_mask(excluded, len(mask))
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            return []
+        scores = score_rows(columns, rows)
+        if len(rows) > self.size:
+            top = np.argpartition(-scores, self.size - 1)[: self.size]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((columns.ids[rows], -scores))
+        return columns.ids[rows[order]].tolist()
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._cache.clear()
+                self._epoch += 1
+            else:
+                self._cache.pop(user_id, None)
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def invalidate_many(self, user_ids: Iterable[str]) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._cache.pop(user_id, None)
+                self._generations[user_id] = self._generations.get(user_id, 0) + 1
@@ -0,0 +1,153 @@
+import hashlib
+import threading
+from email.utils import formatdate
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+import anyio
+from fastapi import Request, Response
+
+import responses
+from compression import MINIMUM_SIZE, THREAD_MINIMUM_SIZE, compress, negotiate_encoding
+from metrics import cache_counters
+
+_HITS, _MISSES = cache_counters("response")
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: str
+    # Kodlama -> önceden sıkıştırılmış gövde; her kodlama versiyon başına bir kez üretilir
+    variants: Dict[str, bytes]
+
+
+def encode_json(content: Any) -> bytes:
+    # Endpoint yanıtlarıyla aynı kodlayıcı (FastJSONResponse)
+    return responses.dumps(content)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """Önceden serileştirilmiş JSON gövdeleri için önbellek.
+
+    Her kayıt bir veri versiyonuna bağlıdır; versiyon değişince gövde
+    yeniden üretilir. If-None-Match eşleşirse modellere dokunmadan 304 döner.
+    `respond` gövdeyi ve büyük sıkıştırılmış varyantları thread havuzunda
+    üretir; event loop sadece önbellek isabetlerini karşılar.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Hashable, CachedBody]] = {}
+        self._lock = threading.Lock()
+        self._variant_lock = threading.Lock()
+
+    def lookup(self, key: str, version: Hashable) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        return None
+
+    def get(
+        self,
+        key: str,
+        version: Hashable,
+        build: Callable[[], Any],
+        encode: Callable[[Any], bytes] = encode_json,
+    ) -> CachedBody:
+        cached = self.lookup(key, version)
+        if cached is not None:
+            _HITS.inc()
+            return cached
+        _MISSES.inc()
+        return self._build(key, version, build, encode)
+
+    def _build(
+        self,
+        key: str,
+        version: Hashable,
+        build: Callable[[], Any],
+        encode: Callable[[Any], bytes],
+    ) -> CachedBody:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                return entry[1]
+            body = encode(build())
+            cached = CachedBody(
+                body=body,
+                etag='"%s"' % hashlib.sha1(body).hexdigest(),
+                last_modified=formatdate(usegmt=True),
+                variants={},
+            )
+            self._entries[key] = (version, cached)
+            return cached
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _variant(self, cached: CachedBody, coding: str) -> bytes:
+        # Thread havuzunda çalışır; büyük bir varyant aynı anda iki kez sıkıştırılmaz
+        with self._variant_lock:
+            body = cached.variants.get(coding)
+            if body is None:
+                body = cached.variants[coding] = compress(coding, cached.body, precompressed=True)
+            return body
+
+    async def respond(
+        self,
+        request: Request,
+        key: str,
+        version: Hashable,
+        build: Callable[[], Any],
+        media_type: str = "application/json",
+        encode: Callable[[Any], bytes] = encode_json,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Response:
+        cached = self.lookup(key, version)
+        if cached is not None:
+            _HITS.inc()
+        else:
+            # Iska: tüm katalog gibi büyük gövdeler event loop'u bloklamasın
+            _MISSES.inc()
+            cached = await anyio.to_thread.run_sync(self._build, key, version, build, encode)
+        coding = None
+        if len(cached.body) >= MINIMUM_SIZE:
+            coding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        # Sıkıştırılmış varyantın kendi ETag'i olur
+        etag = cached.etag if coding is None else '%s-%s"' % (cached.etag[:-1], coding)
+        headers = dict(headers or {})
+        if coding is not None:
+            # Sıkıştırılmamış gövdelerde Vary'yi CompressionMiddleware ekler
+            headers["Vary"] = ", ".join(filter(None, (headers.get("Vary"), "Accept-Encoding")))
+        headers["ETag"] = etag
+        headers["Last-Modified"] = cached.last_modified
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+        if coding is None:
+            return Response(content=cached.body, media_type=media_type, headers=headers)
+        body = cached.variants.get(coding)
+        if body is None:
+            if len(cached.body) >= THREAD_MINIMUM_SIZE:
+                # Yüksek seviyeli brotli/zstd büyük gövdelerde saniyeler sürebilir
+                body = await anyio.to_thread.run_sync(self._variant, cached, coding)
+            else:
+                body = cached.variants[coding] = compress(coding, cached.body, precompressed=True)
+        headers["Content-Encoding"] = coding
+        return Response(content=body, media_type=media_type, headers=headers)
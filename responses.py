@@ -0,0 +1,86 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Optional
+
+import pydantic_core
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from bulk import NDJSON_MEDIA_TYPE
+
+try:
+    import orjson
+except ImportError:  # opsiyonel bağımlılık
+    orjson = None
+
+
+def _pydantic_dumps(content: Any) -> bytes:
+    # pydantic-core (Rust) modelleri, listeleri ve sözlükleri doğrudan bayta yazar
+    return pydantic_core.to_json(content)
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    raise TypeError
+
+
+def _orjson_dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_orjson_default)
+
+
+def _stdlib_dumps(content: Any) -> bytes:
+    # Eski yol: jsonable_encoder + json.dumps (FastAPI JSONResponse ile aynı)
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+JSON_ENCODERS: Dict[str, Callable[[Any], bytes]] = {
+    "pydantic": _pydantic_dumps,
+    "stdlib": _stdlib_dumps,
+}
+if orjson is not None:
+    JSON_ENCODERS["orjson"] = _orjson_dumps
+
+# JSON_ENCODER ortam değişkeniyle seçilir; varsayılan pydantic-core
+dumps = JSON_ENCODERS.get(os.environ.get("JSON_ENCODER", "pydantic"), _pydantic_dumps)
+
+
+class FastJSONResponse(JSONResponse):
+    """Modelleri ara sözlüğe çevirmeden doğrudan bayta kodlayan JSON yanıtı.
+
+    Endpoint'ler model döndürünce FastAPI önce jsonable_encoder ile tüm
+    nesne ağacını kopyalar; bu sınıfı doğrudan döndürmek o adımı atlar.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ndjson_response(
+    items: Iterable[BaseModel],
+    headers: Optional[Dict[str, str]] = None,
+    project: Optional[Callable[[BaseModel], Any]] = None,
+) -> StreamingResponse:
+    """Modelleri satır satır (NDJSON) akıtan yanıt.
+
+    Her satır üretildiği anda kodlanıp gönderilir; tüm gövde bellekte
+    oluşturulmaz, ilk bayt ilk satırla birlikte gider. `project` verilirse
+    her model önce bu seçiciden geçirilir.
+    """
+
+    def generate():
+        if project is not None:
+            for item in items:
+                yield dumps(project(item)) + b"\n"
+            return
+        for item in items:
+            yield item.model_dump_json().encode("utf-8") + b"\n"
+
+    return StreamingResponse(generate(), media_type=NDJSON_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from metrics import cache_counters
+
+_HITS, _MISSES = cache_counters("query_results")
+
+Result = Tuple[np.ndarray, ...]
+
+
+class QueryResultCache:
+    """/query sonuçları için LRU + TTL önbellek.
+
+    Anahtar normalize plan + sıralama (+ katalog versiyonu); değer modeller
+    değil, o versiyondaki sıralı satır (slot) dizileri ve gerekiyorsa sıralama
+    anahtarlarıdır. Katalog versiyonu değişince tüm kayıtlar atılır. Kayıt
+    sayısı (`max_entries`), toplam bayt (`max_bytes`) ve yaş (`ttl`) sınırlıdır.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # anahtar -> (son geçerlilik zamanı, değer, bayt)
+        self._entries: "OrderedDict[Hashable, Tuple[float, Result, int]]" = OrderedDict()
+        self._bytes = 0
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _sync_version(self, version: int) -> None:
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def peek(self, key: Hashable, version: int) -> Optional[Result]:
+        # Sadece isabette değer döner; ıska sayılmaz (çağıran başka bir anahtara düşer)
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    _HITS.inc()
+                    return entry[1]
+                self._discard(key)
+        return None
+
+    def get(self, key: Hashable, version: int, compute: Callable[[], Result]) -> Result:
+        value = self.peek(key, version)
+        if value is not None:
+            return value
+        _MISSES.inc()
+        # Hesaplama kilit dışında; aynı anda gelen iki ıska aynı sonucu üretir
+        value = compute()
+        size = sum(array.nbytes for array in value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            # Hesaplama sırasında katalog değiştiyse eski versiyonun sonucu saklanmaz
+            if version == self._version:
+                self._discard(key)
+                self._entries[key] = (time.monotonic() + self.ttl, value, size)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+        return value
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
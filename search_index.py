@@ -0,0 +1,222 @@
+import re
+import threading
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Alan ağırlıkları (BM25F benzeri): isimdeki eşleşme talimattakinden değerlidir
+FIELD_WEIGHTS = {"name": 3.0, "ingredients": 2.0, "instructions": 1.0}
+
+# Birden fazla terime açılan öneklerin birleşik ID dizileri için toplam bayt sınırı
+MAX_PREFIX_BYTES = 64 * 1024 * 1024
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.casefold())
+
+
+class SearchIndex:
+    """Name, Instructions ve malzeme isimleri üzerinde tam metin indeksi.
+
+    Posting listeleri token -> {recipe ID: ağırlıklı terim frekansı}
+    şeklindedir. Sorgunun son kelimesi önek olarak eşleşir (type-ahead).
+    Sorgu tarafı NumPy ile çalışır: sorgulanan posting'ler ilk kullanımda
+    sıralı (ID, tf, doküman uzunluğu) dizilerine çevrilip saklanır; eşleşme
+    dizi kesişimi, BM25 skoru vektörel hesaptır. Eşleşme skorsuz da
+    alınabilir (`match`), skor sadece gerektiğinde hesaplanır (`scores`).
+    Kısa önekler (ör. "s") çok sayıda terime açılır; birleşik ID dizileri
+    önek başına saklanır ve öneki paylaşan bir token değişince atılır.
+    """
+
+    def __init__(self, recipes=(), k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._doc_tokens: Dict[int, Dict[str, float]] = {}
+        self._doc_len: Dict[int, float] = {}
+        self._total_len = 0.0
+        self._vocab: List[str] = []  # önek araması için sıralı sözlük
+        self._owned: Optional[Set[str]] = None  # None: tüm posting'ler bu nesneye ait
+        # token -> (sıralı ID'ler, tf, doküman uzunluğu); okuyucu thread'ler
+        # doldurduğu için kilitli, posting değişince atılır
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        # önek -> açılımlarının birleşik (sıralı, tekil) ID'leri; aynı kilitle, bayt sınırlı LRU
+        self._prefixes: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._prefix_bytes = 0
+        self._arrays_lock = threading.Lock()
+        for recipe in recipes:
+            self._add(recipe)
+        self._vocab = sorted(self._postings)
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def copy(self) -> "SearchIndex":
+        # Copy-on-write: posting dict'leri paylaşılır, ilk yazmada kopyalanır
+        clone = SearchIndex.__new__(SearchIndex)
+        clone.k1 = self.k1
+        clone.b = self.b
+        clone._postings = dict(self._postings)
+        clone._doc_tokens = dict(self._doc_tokens)
+        clone._doc_len = dict(self._doc_len)
+        clone._total_len = self._total_len
+        clone._vocab = list(self._vocab)
+        clone._owned = set()
+        with self._arrays_lock:
+            clone._arrays = dict(self._arrays)
+            clone._prefixes = OrderedDict(self._prefixes)
+            clone._prefix_bytes = self._prefix_bytes
+        clone._arrays_lock = threading.Lock()
+        return clone
+
+    def _writable(self, token: str) -> Optional[Dict[int, float]]:
+        # Yazılacak posting; dizi hali ve token'ın öneklerinin birleşik dizileri geçersizleşir
+        self._arrays.pop(token, None)
+        for end in range(1, len(token) + 1):
+            merged = self._prefixes.pop(token[:end], None)
+            if merged is not None:
+                self._prefix_bytes -= merged.nbytes
+        posting = self._postings.get(token)
+        owned = self._owned
+        if posting is not None and owned is not None and token not in owned:
+            posting = self._postings[token] = dict(posting)
+            owned.add(token)
+        return posting
+
+    def add(self, recipe: Any) -> None:
+        if recipe.ID in self._doc_len:
+            self.remove(recipe.ID)
+        for token in self._add(recipe):
+            insort(self._vocab, token)
+
+    def _add(self, recipe: Any) -> List[str]:
+        # Dokümanı ekler, sözlüğe yeni giren token'ları döndürür
+        weights: Dict[str, float] = {}
+        fields = (
+            ("name", recipe.Name),
+            ("instructions", recipe.Instructions),
+            ("ingredients", " ".join(i.name for i in recipe.Ingredients)),
+        )
+        for field, text in fields:
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                weights[token] = weights.get(token, 0.0) + weight
+        length = sum(weights.values())
+        self._doc_tokens[recipe.ID] = weights
+        self._doc_len[recipe.ID] = length
+        self._total_len += length
+        new_tokens = []
+        for token, tf in weights.items():
+            posting = self._writable(token)
+            if posting is None:
+                posting = self._postings[token] = {}
+                if self._owned is not None:
+                    self._owned.add(token)
+                new_tokens.append(token)
+            posting[recipe.ID] = tf
+        return new_tokens
+
+    def remove(self, recipe_id: int) -> None:
+        weights = self._doc_tokens.pop(recipe_id, None)
+        if weights is None:
+            return
+        self._total_len -= self._doc_len.pop(recipe_id)
+        for token in weights:
+            posting = self._writable(token)
+            del posting[recipe_id]
+            if not posting:
+                del self._postings[token]
+                del self._vocab[bisect_left(self._vocab, token)]
+
+    def expand(self, prefix: str) -> List[str]:
+        start = bisect_left(self._vocab, prefix)
+        end = bisect_left(self._vocab, prefix + "\U0010ffff", start)
+        return self._vocab[start:end]
+
+    def _posting_arrays(self, token: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        with self._arrays_lock:
+            arrays = self._arrays.get(token)
+        if arrays is None:
+            posting = self._postings[token]
+            ids = np.fromiter(posting.keys(), dtype=np.int64, count=len(posting))
+            tfs = np.fromiter(posting.values(), dtype=np.float64, count=len(posting))
+            doc_len = self._doc_len
+            lengths = np.fromiter((doc_len[rid] for rid in posting), dtype=np.float64, count=len(posting))
+            order = np.argsort(ids)
+            arrays = (ids[order], tfs[order], lengths[order])
+            with self._arrays_lock:
+                self._arrays[token] = arrays
+        return arrays
+
+    def _groups(self, tokens: List[str], prefix: bool) -> Optional[List[Tuple[str, List[str]]]]:
+        # Kelime başına (kelime, eşleşen sözlük terimleri); son kelime önek olarak açılır
+        groups = []
+        for pos, token in enumerate(tokens):
+            if prefix and pos == len(tokens) - 1:
+                terms = self.expand(token)
+            else:
+                terms = [token] if token in self._postings else []
+            if not terms:
+                return None
+            groups.append((token, terms))
+        return groups
+
+    def _group_ids(self, token: str, terms: List[str]) -> np.ndarray:
+        if len(terms) == 1:
+            return self._posting_arrays(terms[0])[0]
+        with self._arrays_lock:
+            merged = self._prefixes.get(token)
+            if merged is not None:
+                self._prefixes.move_to_end(token)
+                return merged
+        merged = np.unique(np.concatenate([self._posting_arrays(term)[0] for term in terms]))
+        with self._arrays_lock:
+            if token not in self._prefixes and merged.nbytes <= MAX_PREFIX_BYTES:
+                self._prefixes[token] = merged
+                self._prefix_bytes += merged.nbytes
+                while self._prefix_bytes > MAX_PREFIX_BYTES:
+                    _, evicted = self._prefixes.popitem(last=False)
+                    self._prefix_bytes -= evicted.nbytes
+        return merged
+
+    def match(self, text: str, prefix: bool = True) -> np.ndarray:
+        """Tüm kelimeleri içeren tariflerin ID'leri (artan, skorsuz)."""
+        groups = self._groups(tokenize(text), prefix)
+        if not groups or not self._doc_len:
+            return np.zeros(0, dtype=np.int64)
+        # En küçük kümeden başlayarak kesiştir
+        doc_sets = sorted((self._group_ids(token, terms) for token, terms in groups), key=len)
+        matched = doc_sets[0]
+        for ids in doc_sets[1:]:
+            if len(matched) == 0:
+                break
+            matched = np.intersect1d(matched, ids, assume_unique=True)
+        return matched
+
+    def scores(self, text: str, recipe_ids: np.ndarray, prefix: bool = True) -> np.ndarray:
+        """`recipe_ids` için BM25 skorları (aynı sırada; eşleşmeyenler 0)."""
+        scores = np.zeros(len(recipe_ids), dtype=np.float64)
+        groups = self._groups(tokenize(text), prefix)
+        if not groups or not self._doc_len or len(recipe_ids) == 0:
+            return scores
+        n_docs = len(self._doc_len)
+        avg_len = self._total_len / n_docs
+        k1, b = self.k1, self.b
+        for _, terms in groups:
+            # Önek açılımlarından en iyi skor kelimenin skorudur
+            best = np.zeros(len(recipe_ids), dtype=np.float64)
+            for term in terms:
+                ids, tfs, lengths = self._posting_arrays(term)
+                df = len(ids)
+                idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                positions = np.minimum(np.searchsorted(ids, recipe_ids), df - 1)
+                hit = ids[positions] == recipe_ids
+                tf = tfs[positions[hit]]
+                norm = k1 * (1.0 - b + b * lengths[positions[hit]] / avg_len)
+                best[hit] = np.maximum(best[hit], idf * tf * (k1 + 1.0) / (tf + norm))
+            scores += best
+        return scores
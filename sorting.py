@@ -0,0 +1,100 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from columnar import SORT_FIELDS
+
+# (alan, azalan mı) çiftleri; ilk anahtar en önceliklisidir
+SortSpec = Tuple[Tuple[str, bool], ...]
+
+DIRECTIONS = {"asc": False, "desc": True}
+
+# Arama alaka skoru (BM25); kolon değil, sorgu başına hesaplanır.
+# En alakalı önce için "relevance desc"
+RELEVANCE = "relevance"
+
+
+def parse_sort(fields: str, direction: str = "asc") -> SortSpec:
+    """`Category asc, Calories desc, ID` gibi bir sıralama ifadesini doğrular.
+
+    Yönü yazılmayan anahtarlar `direction`ı kullanır; tekrar eden alanlar
+    atlanır (ilk yazılan geçerlidir). Hatalı girdide ValueError.
+    """
+    default = DIRECTIONS.get(direction.lower())
+    if default is None:
+        raise ValueError(f"Invalid sort direction: {direction}")
+    spec = []
+    seen = set()
+    for term in fields.split(","):
+        parts = term.split()
+        if not parts or len(parts) > 2:
+            raise ValueError(f"Invalid sort key: {term.strip()}")
+        field = parts[0]
+        if field not in SORT_FIELDS and field != RELEVANCE:
+            raise ValueError(f"Invalid sort field: {field}")
+        reverse = default
+        if len(parts) == 2:
+            reverse = DIRECTIONS.get(parts[1].lower())
+            if reverse is None:
+                raise ValueError(f"Invalid sort direction: {parts[1]}")
+        if field not in seen:
+            seen.add(field)
+            spec.append((field, reverse))
+    return tuple(spec)
+
+
+def with_tiebreak(spec: SortSpec) -> SortSpec:
+    # Sayfalama toplam sıra ister: ID anahtarlarda yoksa son anahtarın yönünde eklenir
+    if any(field == "ID" for field, _ in spec):
+        return spec
+    return spec + (("ID", spec[-1][1]),)
+
+
+def uses_relevance(spec: SortSpec) -> bool:
+    return any(field == RELEVANCE for field, _ in spec)
+
+
+def sort_keys(
+    columns: Any, rows: np.ndarray, spec: SortSpec, relevance: Optional[np.ndarray] = None
+) -> List[np.ndarray]:
+    """Satırların anahtar kolonları; azalan anahtarlar negatiflenir (hepsi artan sıralanır).
+
+    `relevance`, spec'te alaka varsa `rows` ile aynı sıradaki skorlardır.
+    """
+    keys = []
+    for field, reverse in spec:
+        key = relevance if field == RELEVANCE else columns.sort_key(field)[rows]
+        keys.append(-key if reverse else key)
+    return keys
+
+
+def cursor_key(columns: Any, spec: SortSpec, values: Sequence[Any]) -> Tuple[Any, ...]:
+    """Cursor değerlerini `sort_keys` ile aynı anahtar uzayına taşır."""
+    if len(values) != len(spec):
+        raise ValueError("Invalid cursor")
+    key = []
+    for (field, reverse), value in zip(spec, values):
+        if field == RELEVANCE:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("Invalid value for relevance")
+            value = np.float64(value)
+        else:
+            value = columns.key_of(field, value)
+        key.append(-value if reverse else value)
+    return tuple(key)
+
+
+def cursor_values(
+    columns: Any, spec: SortSpec, rows: np.ndarray, keys: Sequence[np.ndarray], position: int
+) -> List[Any]:
+    # Cursor'a anahtarların kendisi değil alan değerleri yazılır; böylece
+    # katalog değişip rütbeler kaysa da cursor geçerli kalır. Alaka skoru
+    # kolonda olmadığı için sıralı anahtardan geri çevrilir
+    values = []
+    for (field, reverse), key in zip(spec, keys):
+        if field == RELEVANCE:
+            value = key[position].item()
+            values.append(-value if reverse else value)
+        else:
+            values.append(columns.value_of(field, int(rows[position])))
+    return values
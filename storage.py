@@ -0,0 +1,382 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Collection, Dict, Generic, Iterable, List, Optional, Tuple, Type, TypeVar
+
+import anyio
+from pydantic import BaseModel
+
+from metrics import REGISTRY, cache_counters
+
+M = TypeVar("M", bound=BaseModel)
+
+logger = logging.getLogger(__name__)
+
+_WRITER_ERRORS = REGISTRY.counter("user_store_writer_errors_total", "Failed background flush/poll turns by store")
+
+# Varsayılan veritabanı dosyası; USER_STORE_PATH=memory ile süreç içi depo kullanılır
+DEFAULT_STORE_PATH = "user_data.db"
+
+# Okuma önbelleği süresi (saniye). Diğer worker'ların yazmaları süre
+# dolmadan da görünür: yazıcı thread her turda değişen satırları bulup atar
+DEFAULT_CACHE_TTL = 300.0
+
+_MISSING = object()
+
+
+class UserStore(Generic[M]):
+    """Kullanıcı verisi (tercih/alerji) deposu arayüzü.
+
+    Endpoint'ler depoyu sözlük gibi kullanır: `key in store`, `store[key]`,
+    `store.get(key)`, `store[key] = model`. Async endpoint'ler için `aget` ve
+    `aset_many` event loop'u bloklamaz; varsayılan uygulama engelleyici
+    çağrıyı thread havuzuna taşır, alt sınıflar hızlı yolları ezer.
+    """
+
+    def get(self, user_id: str, default=None):
+        raise NotImplementedError
+
+    def set_many(self, items: Iterable[M]) -> None:
+        raise NotImplementedError
+
+    async def aget(self, user_id: str, default=None):
+        return await anyio.to_thread.run_sync(self.get, user_id, default)
+
+    async def aset_many(self, items: Iterable[M]) -> None:
+        await anyio.to_thread.run_sync(self.set_many, list(items))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def subscribe(self, callback: Callable[[List[str]], None]) -> None:
+        # Başka bir süreç kayıt değiştirdiğinde `callback(user_ids)` çağrılır;
+        # süreç içi depoda başka yazan yoktur
+        pass
+
+    def stats(self) -> Dict[str, int]:
+        # Metrik olarak raporlanan bellek/boyut bilgileri
+        return {}
+
+    def __contains__(self, user_id: str) -> bool:
+        return self.get(user_id, _MISSING) is not _MISSING
+
+    def __getitem__(self, user_id: str) -> M:
+        value = self.get(user_id, _MISSING)
+        if value is _MISSING:
+            raise KeyError(user_id)
+        return value
+
+    def __setitem__(self, user_id: str, value: M) -> None:
+        self.set_many([value])
+
+
+class MemoryUserStore(UserStore[M]):
+    """Süreç içi sözlük; eski davranış (yeniden başlatınca veriler kaybolur)."""
+
+    def __init__(self):
+        self._data: Dict[str, M] = {}
+
+    def get(self, user_id: str, default=None):
+        return self._data.get(user_id, default)
+
+    def set_many(self, items: Iterable[M]) -> None:
+        for item in items:
+            self._data[item.user_id] = item
+
+    async def aget(self, user_id: str, default=None):
+        return self._data.get(user_id, default)
+
+    async def aset_many(self, items: Iterable[M]) -> None:
+        self.set_many(items)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._data)}
+
+
+class SQLiteUserStore(UserStore[M]):
+    """SQLite (WAL) üzerinde kalıcı depo.
+
+    Yazmalar write-behind'dır: bekleyen kayıtlar bellekte toplanır ve arka
+    plandaki iş parçacığı tarafından `flush_interval` saniyede bir (ya da
+    `batch_size` dolunca) tek transaction ile yazılır. Okumalar önce bekleyen
+    yazmalara, sonra boyut (`cache_size`) ve süre (`cache_ttl`) sınırlı bir
+    LRU önbelleğe, en son veritabanına bakar. Olmayan kullanıcı kayıtları
+    flush aralığından uzun tutulmaz.
+
+    Her satır bir versiyon taşır (flush başına tablo geneli artan sayı).
+    Yazıcı thread her turda `PRAGMA data_version` ile başka bir bağlantının
+    yazıp yazmadığına bakar; yazdıysa son görülen versiyondan yeni satırlar
+    okunur, önbellekten atılır ve `subscribe` ile kaydolanlara bildirilir.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        model: Type[M],
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        cache_size: int = 10000,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+    ):
+        self.table = table
+        self.model = model
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.negative_ttl = min(cache_ttl, flush_interval)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL ile NORMAL: commit başına fsync yok, checkpoint'te senkronize edilir
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} "
+            "(user_id TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+        if "version" not in columns:
+            # Versiyon kolonu olmadan oluşturulmuş eski tablolar
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_version ON {table} (version)")
+        self._seen_version = self._conn.execute(
+            f"SELECT COALESCE(MAX(version), 0) FROM {table}"
+        ).fetchone()[0]
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        self._listeners: List[Callable[[List[str]], None]] = []
+        self._db_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending: Dict[str, M] = {}
+        self._inflight: Dict[str, M] = {}  # yazılmakta olan batch
+        # user_id -> (değer, son geçerlilik zamanı, yaklaşık bayt)
+        self._cache: "OrderedDict[str, Tuple[Optional[M], float, int]]" = OrderedDict()
+        self._cache_bytes = 0
+        # Yazma sırası: okuma başlarken alınır; veritabanından okunan değer
+        # ancak o anahtara arada yazma olmadıysa önbelleğe girer. _written
+        # cache_size ile sınırlıdır; düşen kayıtların en büyük sırası _written_floor
+        self._sequence = 0
+        self._written: "OrderedDict[str, int]" = OrderedDict()
+        self._written_floor = 0
+        self._hits, self._misses = cache_counters(f"{table}_store")
+        self._errors = _WRITER_ERRORS.labels(store=table)
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name=f"{table}-writer", daemon=True)
+        self._writer.start()
+
+    # Okuma
+
+    def _peek(self, user_id: str) -> Tuple[object, int]:
+        # Veritabanına gitmeden: bekleyen yazmalar ve LRU önbellek. Iskada
+        # dönen yazma sırası get()'in önbelleğe yazıp yazmayacağını belirler
+        with self._lock:
+            sequence = self._sequence
+            value = self._pending.get(user_id, _MISSING)
+            if value is _MISSING:
+                value = self._inflight.get(user_id, _MISSING)
+            if value is _MISSING:
+                entry = self._cache.get(user_id)
+                if entry is not None:
+                    if entry[1] > time.monotonic():
+                        value = entry[0]
+                        self._cache.move_to_end(user_id)
+                    else:
+                        self._forget(user_id)
+        (self._misses if value is _MISSING else self._hits).inc()
+        return value, sequence
+
+    def get(self, user_id: str, default=None):
+        value, sequence = self._peek(user_id)
+        if value is _MISSING:
+            value, size = self._load(user_id)
+            with self._lock:
+                # Okuma sırasında gelen bir yazma (bekleyen, yazılmakta ya da
+                # çoktan yazılmış) varsa okunan eski değer önbelleğe alınmaz
+                if self._unchanged_since(user_id, sequence):
+                    self._remember(user_id, value, size)
+        return default if value is None else value
+
+    async def aget(self, user_id: str, default=None):
+        # Önbellek isabeti event loop'ta döner, sadece veritabanı okuması thread'e gider
+        value, _ = self._peek(user_id)
+        if value is _MISSING:
+            return await anyio.to_thread.run_sync(self.get, user_id, default)
+        return default if value is None else value
+
+    def _load(self, user_id: str) -> Tuple[Optional[M], int]:
+        with self._db_lock:
+            row = self._conn.execute(
+                f"SELECT data FROM {self.table} WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        if row is None:
+            return None, 0
+        return self.model.model_validate_json(row[0]), len(row[0])
+
+    def _remember(self, user_id: str, value: Optional[M], size: int) -> None:
+        # Olmayan kullanıcılar da (None) önbelleğe alınır, ama daha kısa süre
+        self._forget(user_id)
+        ttl = self.cache_ttl if value is not None else self.negative_ttl
+        self._cache[user_id] = (value, time.monotonic() + ttl, size)
+        self._cache_bytes += size
+        while len(self._cache) > self.cache_size:
+            _, (_, _, evicted) = self._cache.popitem(last=False)
+            self._cache_bytes -= evicted
+
+    def _forget(self, user_id: str) -> None:
+        entry = self._cache.pop(user_id, None)
+        if entry is not None:
+            self._cache_bytes -= entry[2]
+
+    def _touch(self, user_ids: Collection[str]) -> None:
+        # Kilit altında: anahtarlara yazıldı; önbellek kayıtları atılır, yazma sırası ilerler
+        self._sequence += 1
+        if len(user_ids) >= self.cache_size:
+            # Büyük toplu yazma: tek tek saymak yerine eşik ilerletilir ve
+            # sadece önbellekte olan anahtarlar gezilir
+            self._written.clear()
+            self._written_floor = self._sequence
+            for user_id in [user_id for user_id in self._cache if user_id in user_ids]:
+                self._forget(user_id)
+            return
+        for user_id in user_ids:
+            self._forget(user_id)
+            self._written[user_id] = self._sequence
+            self._written.move_to_end(user_id)
+        while len(self._written) > self.cache_size:
+            _, sequence = self._written.popitem(last=False)
+            self._written_floor = sequence
+
+    def _unchanged_since(self, user_id: str, sequence: int) -> bool:
+        # Düşen kayıtlar bilinmediği için eşikten eski okumalar değişmiş sayılır
+        return sequence >= self._written_floor and self._written.get(user_id, 0) <= sequence
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "cache_entries": len(self._cache),
+                "cache_bytes": self._cache_bytes,
+                "pending_writes": len(self._pending) + len(self._inflight),
+            }
+
+    def __len__(self) -> int:
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    # Yazma (write-behind)
+
+    def set_many(self, items: Iterable[M]) -> None:
+        # Toplu yazma kilit dışında hazırlanır, bekleyen yazmalara tek seferde
+        # eklenir: okumalar ve flush ya hepsini ya hiçbirini görür
+        batch = {item.user_id: item for item in items}
+        with self._lock:
+            self._pending.update(batch)
+            self._touch(batch)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    async def aset_many(self, items: Iterable[M]) -> None:
+        # Write-behind: sadece bellekte kuyruğa alır, disk I/O yok
+        self.set_many(items)
+
+    def flush(self) -> None:
+        # Flush'lar sıralıdır; çağıran, o ana kadar bekleyen her şey yazılana kadar bekler
+        with self._flush_lock:
+            with self._lock:
+                if not self._pending:
+                    return
+                batch = self._inflight = self._pending
+                self._pending = {}
+            rows = [(user_id, item.model_dump_json()) for user_id, item in batch.items()]
+            try:
+                with self._db_lock:
+                    # IMMEDIATE: yazma kilidi baştan alınır, versiyonu başka worker kapamaz
+                    self._conn.execute("BEGIN IMMEDIATE")
+                    latest = self._conn.execute(
+                        f"SELECT COALESCE(MAX(version), 0) FROM {self.table}"
+                    ).fetchone()[0]
+                    self._conn.executemany(
+                        f"INSERT OR REPLACE INTO {self.table} (user_id, data, version) VALUES (?, ?, ?)",
+                        [(user_id, data, latest + 1) for user_id, data in rows],
+                    )
+                    self._conn.execute("COMMIT")
+                    if latest == self._seen_version:
+                        # Arada başka yazan yok: kendi satırlarımız değişiklik sayılmaz
+                        self._seen_version = latest + 1
+            except Exception:
+                with self._db_lock:
+                    if self._conn.in_transaction:
+                        self._conn.execute("ROLLBACK")
+                # Yazılamayanlar bir sonraki turda yeniden denenir (yeni değerler öncelikli)
+                with self._lock:
+                    for user_id, item in batch.items():
+                        self._pending.setdefault(user_id, item)
+                    self._inflight = {}
+                raise
+            with self._lock:
+                self._inflight = {}
+
+    def subscribe(self, callback: Callable[[List[str]], None]) -> None:
+        self._listeners.append(callback)
+
+    def poll(self) -> List[str]:
+        """Diğer bağlantıların değiştirdiği kullanıcıları bulur ve önbellekten atar."""
+        with self._db_lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if data_version == self._data_version:
+                return []
+            self._data_version = data_version
+            rows = self._conn.execute(
+                f"SELECT user_id, version FROM {self.table} WHERE version > ?", (self._seen_version,)
+            ).fetchall()
+            if rows:
+                self._seen_version = max(version for _, version in rows)
+        changed = [user_id for user_id, _ in rows]
+        if changed:
+            with self._lock:
+                self._touch(set(changed))
+            for callback in self._listeners:
+                callback(changed)
+        return changed
+
+    def _run(self) -> None:
+        # Hatalar thread'i öldürmez: loglanır, sayılır ve bir sonraki turda
+        # yeniden denenir (yazılamayanlar _pending'de kalır, bkz. stats())
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            for step in (self.flush, self.poll):
+                try:
+                    step()
+                except Exception:
+                    self._errors.inc()
+                    logger.exception("%s store: background %s failed", self.table, step.__name__)
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join()
+        self.flush()
+        with self._db_lock:
+            self._conn.close()
+
+
+def open_user_store(table: str, model: Type[M], path: Optional[str] = None) -> UserStore[M]:
+    path = path or os.environ.get("USER_STORE_PATH", DEFAULT_STORE_PATH)
+    if path == "memory":
+        return MemoryUserStore()
+    return SQLiteUserStore(path, table, model)